@@ -195,7 +195,7 @@ class FamilyGroupSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_member_count(self, obj):
-        return obj.members.count()
+        return obj.get_member_count()
 
 # Moderation Serializers
 class PendingChangeSerializer(serializers.ModelSerializer):
@@ -5,6 +5,7 @@ import json
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -574,6 +575,45 @@ class FilterTestCase(BaseTestCase):
         self.assertEqual(response.data['results'][0]['name'], 'Jane Smith')
         self.assertEqual(response.data['results'][1]['name'], 'John Doe')
 
+class BulkOperationTestCase(APITestCase):
+    """Test bulk phonebook operations and their effect on cached family inference"""
+    
+    def setUp(self):
+        cache.clear()
+        self.admin_user = User.objects.create_user(
+            username='bulkadmin',
+            email='bulkadmin@example.com',
+            password='adminpass123',
+            user_type='admin',
+            is_staff=True
+        )
+        self.entry1 = PhoneBookEntry.objects.create(
+            pid=5001, name='John Doe', contact='7771234', address='Palm House', island='Male', status='active'
+        )
+        self.entry2 = PhoneBookEntry.objects.create(
+            pid=5002, name='Jane Doe', contact='7775678', address='Palm House', island='Male', status='active'
+        )
+        self.client.force_authenticate(user=self.admin_user)
+    
+    def test_update_status_clears_cached_inference(self):
+        """Bulk status updates look entries up by pid and forget the cached family of their address"""
+        cache_key = FamilyGroup.inference_cache_key('Palm House', 'Male')
+        cache.set(cache_key, {'pk': 0, 'updated_at': None})
+        url = reverse('phonebook-bulk-operation')
+        data = {
+            'operation': 'update_status',
+            'entry_ids': [self.entry1.pid, self.entry2.pid],
+            'update_data': {'status': 'inactive'}
+        }
+        
+        response = self.client.post(url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(PhoneBookEntry.objects.values_list('status', flat=True)), {'inactive'}
+        )
+        self.assertIsNone(cache.get(cache_key))
+
 if __name__ == '__main__':
     # Run tests
     import django
@@ -589,7 +629,8 @@ if __name__ == '__main__':
         AnalyticsTestCase,
         HealthCheckTestCase,
         PermissionTestCase,
-        FilterTestCase
+        FilterTestCase,
+        BulkOperationTestCase
     ]
     
     for test_case in test_cases:
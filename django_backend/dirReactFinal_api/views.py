@@ -19,6 +19,7 @@ from .permissions import (
     CanModerate, CanViewAnalytics, IsOwnerOrAdmin
 )
 import json
+import logging
 
 # Import models
 from dirReactFinal_core.models import User, UserPermission, EventLog
@@ -37,6 +38,8 @@ from .serializers import (
     EventLogSerializer, SearchSerializer, BulkOperationSerializer
 )
 
+logger = logging.getLogger(__name__)
+
 # Authentication Views
 class UserLoginView(APIView):
     """User login endpoint"""
@@ -413,7 +416,7 @@ class UserViewSet(viewsets.ModelViewSet):
         except Exception as e:
             import traceback
             error_details = traceback.format_exc()
-            print(f"Error deactivating user: {error_details}")
+            logger.exception("Error deactivating user")
             
             return Response({
                 'error': 'Failed to deactivate user',
@@ -468,7 +471,7 @@ class PhoneBookEntryViewSet(viewsets.ModelViewSet):
         try:
             serializer = SearchSerializer(data=request.data)
             if not serializer.is_valid():
-                print(f"SearchSerializer validation errors: {serializer.errors}")
+                logger.debug("SearchSerializer validation errors: %s", serializer.errors)
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             
             data = serializer.validated_data
@@ -493,15 +496,16 @@ class PhoneBookEntryViewSet(viewsets.ModelViewSet):
             is_family_search = data.get('limit_results', False)  # Flag for family searches
             use_and_logic = data.get('useAndLogic', False)  # Flag for comma-separated queries
             
-            print(f"Search analysis - Address: {has_address_filter}, Island: {has_island_filter}, Query: {has_query}, Family search: {is_family_search}, Use AND logic: {use_and_logic}")
+            logger.debug("Search analysis - Address: %s, Island: %s, Query: %s, Family search: %s, Use AND logic: %s", has_address_filter, has_island_filter, has_query, is_family_search, use_and_logic)
             
             # 2025-01-28: Handle comma-separated queries with AND logic for proper narrowing
             if use_and_logic:
-                print(f"Comma-separated query detected - using AND logic for all specified fields")
+                logger.debug("Comma-separated query detected - using AND logic for all specified fields")
                 
                 # Reset queryset to all entries for comma-separated search
                 queryset = PhoneBookEntry.objects.all()
-                print(f"Reset queryset to all entries: {queryset.count()}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Reset queryset to all entries: %s", queryset.count())
                 
                 # Build AND query for all specified fields
                 and_conditions = Q()
@@ -511,77 +515,78 @@ class PhoneBookEntryViewSet(viewsets.ModelViewSet):
                     name_query = create_wildcard_query('name', data['name'].strip())
                     and_conditions &= name_query
                     field_count += 1
-                    print(f"Added name filter: '{data['name'].strip()}'")
+                    logger.debug("Added name filter: '%s'", data['name'].strip())
                 
                 if has_address_filter:
                     address_query = create_wildcard_query('address', data['address'].strip())
                     and_conditions &= address_query
                     field_count += 1
-                    print(f"Added address filter: '{data['address'].strip()}'")
+                    logger.debug("Added address filter: '%s'", data['address'].strip())
                 
                 if has_island_filter:
                     island_query = create_wildcard_query('island', data['island'].strip())
                     and_conditions &= island_query
                     field_count += 1
-                    print(f"Added island filter: '{data['island'].strip()}'")
+                    logger.debug("Added island filter: '%s'", data['island'].strip())
                 
                 if has_party_filter:
                     party_query = create_wildcard_query('party', data['party'].strip())
                     and_conditions &= party_query
                     field_count += 1
-                    print(f"Added party filter: '{data['party'].strip()}'")
+                    logger.debug("Added party filter: '%s'", data['party'].strip())
                 
                 if has_contact_filter:
                     contact_query = create_wildcard_query('contact', data['contact'].strip())
                     and_conditions &= contact_query
                     field_count += 1
-                    print(f"Added contact filter: '{data['contact'].strip()}'")
+                    logger.debug("Added contact filter: '%s'", data['contact'].strip())
                 
                 if has_nid_filter:
                     nid_query = create_wildcard_query('nid', data['nid'].strip())
                     and_conditions &= nid_query
                     field_count += 1
-                    print(f"Added NID filter: '{data['nid'].strip()}'")
+                    logger.debug("Added NID filter: '%s'", data['nid'].strip())
                 
                 if has_profession_filter:
                     profession_query = create_wildcard_query('profession', data['profession'].strip())
                     and_conditions &= profession_query
                     field_count += 1
-                    print(f"Added profession filter: '{data['profession'].strip()}'")
+                    logger.debug("Added profession filter: '%s'", data['profession'].strip())
                 
                 if has_gender_filter:
                     gender_query = create_wildcard_query('gender', data['gender'].strip())
                     and_conditions &= gender_query
                     field_count += 1
-                    print(f"Added gender filter: '{data['gender'].strip()}'")
+                    logger.debug("Added gender filter: '%s'", data['gender'].strip())
                 
                 if has_min_age_filter:
                     and_conditions &= Q(age__gte=data['min_age'])
                     field_count += 1
-                    print(f"Added min age filter: {data['min_age']}")
+                    logger.debug("Added min age filter: %s", data['min_age'])
                 
                 if has_max_age_filter:
                     and_conditions &= Q(age__lte=data['max_age'])
                     field_count += 1
-                    print(f"Added max age filter: {data['max_age']}")
+                    logger.debug("Added max age filter: %s", data['max_age'])
                 
-                print(f"Comma-separated query: {field_count} fields with AND logic")
+                logger.debug("Comma-separated query: %s fields with AND logic", field_count)
                 
                 # Apply AND logic to get precise results
                 precise_queryset = queryset.filter(and_conditions)
-                print(f"Results after AND logic: {precise_queryset.count()}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Results after AND logic: %s", precise_queryset.count())
                 
                 if precise_queryset.count() > 0:
                     queryset = precise_queryset
-                    print("Using precise AND logic results for comma-separated query")
+                    logger.debug("Using precise AND logic results for comma-separated query")
                     
                     # Show sample results for debugging
-                    sample_entries = queryset[:3]
-                    for entry in sample_entries:
-                        print(f"Sample result: {entry.name} - Address: {entry.address} - Island: {entry.island} - Party: {entry.party}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        for entry in queryset[:3]:
+                            logger.debug("Sample result: %s - Address: %s - Island: %s - Party: %s", entry.name, entry.address, entry.island, entry.party)
                 else:
-                    print("No results found with AND logic for comma-separated query")
-                    print("This combination of fields may not exist in the database")
+                    logger.debug("No results found with AND logic for comma-separated query")
+                    logger.debug("This combination of fields may not exist in the database")
                 
                 # Return early since we've handled the comma-separated query
                 serializer = PhoneBookEntrySerializer(queryset, many=True)
@@ -596,43 +601,45 @@ class PhoneBookEntryViewSet(viewsets.ModelViewSet):
             # PRIORITY: Handle specific field filters FIRST (address+island, address+party, etc.)
             # This ensures that when users search with specific fields, they get precise results
             if has_address_filter and has_island_filter:
-                print(f"Smart search case: Address='{data['address']}', Island='{data['island']}'")
+                logger.debug("Smart search case: Address='%s', Island='%s'", data['address'], data['island'])
                 
                 # Reset queryset to all entries since we're doing custom field-based search
                 # The smart query analysis was filtering out results prematurely
                 queryset = PhoneBookEntry.objects.all()
-                print(f"Reset queryset to all entries: {queryset.count()}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Reset queryset to all entries: %s", queryset.count())
                 
                 # For address + island combination, try AND logic first for precise results
                 # If no results, fall back to OR logic for broader results
                 address_term = data['address'].strip()
                 island_term = data['island'].strip()
                 
-                print(f"Searching for address term: '{address_term}' AND island term: '{island_term}'")
-                print(f"First trying AND logic for precise results...")
+                logger.debug("Searching for address term: '%s' AND island term: '%s'", address_term, island_term)
+                logger.debug("First trying AND logic for precise results...")
                 
                 # Debug: Check what exists in the database for these terms
-                print(f"Database check - Entries with address containing '{address_term}': {PhoneBookEntry.objects.filter(address__icontains=address_term).count()}")
-                print(f"Database check - Entries with island containing '{island_term}': {PhoneBookEntry.objects.filter(island__icontains=island_term).count()}")
-                
-                # Show some sample entries for debugging
-                address_entries = PhoneBookEntry.objects.filter(address__icontains=address_term)[:3]
-                island_entries = PhoneBookEntry.objects.filter(island__icontains=island_term)[:3]
-                
-                if address_entries.exists():
-                    print(f"Sample address entries for '{address_term}':")
-                    for entry in address_entries:
-                        print(f"  - {entry.name}: address='{entry.address}', island='{entry.island}'")
-                
-                if island_entries.exists():
-                    print(f"Sample island entries for '{island_term}':")
-                    for entry in island_entries:
-                        print(f"  - {entry.name}: address='{entry.address}', island='{entry.island}'")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Database check - Entries with address containing '%s': %s", address_term, PhoneBookEntry.objects.filter(address__icontains=address_term).count())
+                    logger.debug("Database check - Entries with island containing '%s': %s", island_term, PhoneBookEntry.objects.filter(island__icontains=island_term).count())
+                    
+                    # Show some sample entries for debugging
+                    address_entries = PhoneBookEntry.objects.filter(address__icontains=address_term)[:3]
+                    island_entries = PhoneBookEntry.objects.filter(island__icontains=island_term)[:3]
+                    
+                    if address_entries.exists():
+                        logger.debug("Sample address entries for '%s':", address_term)
+                        for entry in address_entries:
+                            logger.debug("  - %s: address='%s', island='%s'", entry.name, entry.address, entry.island)
+                    
+                    if island_entries.exists():
+                        logger.debug("Sample island entries for '%s':", island_term)
+                        for entry in island_entries:
+                            logger.debug("  - %s: address='%s', island='%s'", entry.name, entry.address, entry.island)
                 
                 # First try: Use AND logic for precise results (narrow scope)
                 # For family searches, use exact matching; otherwise use wildcard-aware matching
                 if is_family_search:
-                    print("Using exact matching for family search")
+                    logger.debug("Using exact matching for family search")
                     precise_queryset = queryset.filter(
                         Q(address__iexact=address_term) & Q(island__iexact=island_term)
                     )
@@ -642,209 +649,223 @@ class PhoneBookEntryViewSet(viewsets.ModelViewSet):
                     island_query = create_wildcard_query('island', island_term)
                     precise_queryset = queryset.filter(address_query & island_query)
                 
-                print(f"Results after AND logic (precise): {precise_queryset.count()}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Results after AND logic (precise): %s", precise_queryset.count())
                 
                 if precise_queryset.count() > 0:
                     # Use the precise results
                     queryset = precise_queryset
-                    print("Using precise AND logic results")
+                    logger.debug("Using precise AND logic results")
                 else:
                     # No precise results, try OR logic for broader results
-                    print("No precise results found, trying OR logic for broader results...")
+                    logger.debug("No precise results found, trying OR logic for broader results...")
                     
                     broader_queryset = queryset.filter(
                         address_query | island_query
                     )
                     
-                    print(f"Results after OR logic (broader): {broader_queryset.count()}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Results after OR logic (broader): %s", broader_queryset.count())
                     
                     if broader_queryset.count() > 0:
                         queryset = broader_queryset
-                        print("Using broader OR logic results")
-                        print("Note: These results match EITHER address OR island, not necessarily both")
+                        logger.debug("Using broader OR logic results")
+                        logger.debug("Note: These results match EITHER address OR island, not necessarily both")
                         
                         # Show some sample entries to understand what was found
-                        sample_entries = queryset[:3]
-                        for entry in sample_entries:
-                            print(f"Sample entry: {entry.name} - Address: {entry.address} - Island: {entry.island} - Atoll: {entry.atoll}")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            for entry in queryset[:3]:
+                                logger.debug("Sample entry: %s - Address: %s - Island: %s - Atoll: %s", entry.name, entry.address, entry.island, entry.atoll)
                     else:
-                        print("No results found with either AND or OR logic")
-                        print("This combination may not exist in the database")
+                        logger.debug("No results found with either AND or OR logic")
+                        logger.debug("This combination may not exist in the database")
             
             # Handle the case where we have both address and party filters (smart search case)
             elif has_address_filter and has_party_filter:
-                print(f"Smart search case: Address='{data['address']}', Party='{data['party']}'")
+                logger.debug("Smart search case: Address='%s', Party='%s'", data['address'], data['party'])
                 
                 # Reset queryset to all entries since we're doing custom field-based search
                 queryset = PhoneBookEntry.objects.all()
-                print(f"Reset queryset to all entries: {queryset.count()}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Reset queryset to all entries: %s", queryset.count())
                 
                 # For address + party combination, try AND logic first for precise results
                 # If no results, fall back to OR logic for broader results
                 address_term = data['address'].strip()
                 party_term = data['party'].strip()
                 
-                print(f"Searching for address term: '{address_term}' AND party term: '{party_term}'")
-                print(f"First trying AND logic for precise results...")
+                logger.debug("Searching for address term: '%s' AND party term: '%s'", address_term, party_term)
+                logger.debug("First trying AND logic for precise results...")
                 
                 # Debug: Check what exists in the database for these terms
-                print(f"Database check - Entries with address containing '{address_term}': {PhoneBookEntry.objects.filter(address__icontains=address_term).count()}")
-                print(f"Database check - Entries with party containing '{party_term}': {PhoneBookEntry.objects.filter(party__icontains=party_term).count()}")
-                
-                # Show some sample entries for debugging
-                address_entries = PhoneBookEntry.objects.filter(address__icontains=address_term)[:3]
-                party_entries = PhoneBookEntry.objects.filter(party__icontains=party_term)[:3]
-                
-                if address_entries.exists():
-                    print(f"Sample address entries for '{address_term}':")
-                    for entry in address_entries:
-                        print(f"  - {entry.name}: address='{entry.address}', party='{entry.party}'")
-                
-                if party_entries.exists():
-                    print(f"Sample party entries for '{party_term}':")
-                    for entry in party_entries:
-                        print(f"  - {entry.name}: address='{entry.address}', party='{entry.party}'")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Database check - Entries with address containing '%s': %s", address_term, PhoneBookEntry.objects.filter(address__icontains=address_term).count())
+                    logger.debug("Database check - Entries with party containing '%s': %s", party_term, PhoneBookEntry.objects.filter(party__icontains=party_term).count())
+                    
+                    # Show some sample entries for debugging
+                    address_entries = PhoneBookEntry.objects.filter(address__icontains=address_term)[:3]
+                    party_entries = PhoneBookEntry.objects.filter(party__icontains=party_term)[:3]
+                    
+                    if address_entries.exists():
+                        logger.debug("Sample address entries for '%s':", address_term)
+                        for entry in address_entries:
+                            logger.debug("  - %s: address='%s', party='%s'", entry.name, entry.address, entry.party)
+                    
+                    if party_entries.exists():
+                        logger.debug("Sample party entries for '%s':", party_term)
+                        for entry in party_entries:
+                            logger.debug("  - %s: address='%s', party='%s'", entry.name, entry.address, entry.party)
                 
                 # First try: Use AND logic for precise results (narrow scope)
                 address_query = create_wildcard_query('address', address_term)
                 party_query = create_wildcard_query('party', party_term)
                 precise_queryset = queryset.filter(address_query & party_query)
                 
-                print(f"Results after AND logic (precise): {precise_queryset.count()}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Results after AND logic (precise): %s", precise_queryset.count())
                 
                 if precise_queryset.count() > 0:
                     # Use the precise results
                     queryset = precise_queryset
-                    print("Using precise AND logic results")
+                    logger.debug("Using precise AND logic results")
                 else:
                     # No precise results, try OR logic for broader results
-                    print("No precise results found, trying OR logic for broader results...")
+                    logger.debug("No precise results found, trying OR logic for broader results...")
                     
                     broader_queryset = queryset.filter(
                         address_query | party_query
                     )
                     
-                    print(f"Results after OR logic (broader): {broader_queryset.count()}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Results after OR logic (broader): %s", broader_queryset.count())
                     
                     if broader_queryset.count() > 0:
                         queryset = broader_queryset
-                        print("Using broader OR logic results")
-                        print("Note: These results match EITHER address OR party, not necessarily both")
+                        logger.debug("Using broader OR logic results")
+                        logger.debug("Note: These results match EITHER address OR party, not necessarily both")
                     else:
-                        print("No results found with either AND or OR logic")
+                        logger.debug("No results found with either AND or OR logic")
             
             # Handle the case where we have both name and party filters (smart search case)
             elif has_name_filter and has_party_filter:
-                print(f"Smart search case: Name='{data['name']}', Party='{data['party']}'")
+                logger.debug("Smart search case: Name='%s', Party='%s'", data['name'], data['party'])
                 
                 # Reset queryset to all entries since we're doing custom field-based search
                 queryset = PhoneBookEntry.objects.all()
-                print(f"Reset queryset to all entries: {queryset.count()}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Reset queryset to all entries: %s", queryset.count())
                 
                 # For name + party combination, try AND logic first for precise results
                 # If no results, fall back to OR logic for broader results
                 name_term = data['name'].strip()
                 party_term = data['party'].strip()
                 
-                print(f"Searching for name term: '{name_term}' AND party term: '{party_term}'")
-                print(f"First trying AND logic for precise results...")
+                logger.debug("Searching for name term: '%s' AND party term: '%s'", name_term, party_term)
+                logger.debug("First trying AND logic for precise results...")
                 
                 # Debug: Check what exists in the database for these terms
-                print(f"Database check - Entries with name containing '{name_term}': {PhoneBookEntry.objects.filter(name__icontains=name_term).count()}")
-                print(f"Database check - Entries with party containing '{party_term}': {PhoneBookEntry.objects.filter(party__icontains=party_term).count()}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Database check - Entries with name containing '%s': %s", name_term, PhoneBookEntry.objects.filter(name__icontains=name_term).count())
+                    logger.debug("Database check - Entries with party containing '%s': %s", party_term, PhoneBookEntry.objects.filter(party__icontains=party_term).count())
                 
                 # First try: Use AND logic for precise results (narrow scope)
                 name_query = create_wildcard_query('name', name_term)
                 party_query = create_wildcard_query('party', party_term)
                 precise_queryset = queryset.filter(name_query & party_query)
                 
-                print(f"Results after AND logic (precise): {precise_queryset.count()}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Results after AND logic (precise): %s", precise_queryset.count())
                 
                 if precise_queryset.count() > 0:
                     # Use the precise results
                     queryset = precise_queryset
-                    print("Using precise AND logic results")
+                    logger.debug("Using precise AND logic results")
                 else:
                     # No precise results, try OR logic for broader results
-                    print("No precise results found, trying OR logic for broader results...")
+                    logger.debug("No precise results found, trying OR logic for broader results...")
                     
                     broader_queryset = queryset.filter(
                         name_query | party_query
                     )
                     
-                    print(f"Results after OR logic (broader): {broader_queryset.count()}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Results after OR logic (broader): %s", broader_queryset.count())
                     
                     if broader_queryset.count() > 0:
                         queryset = broader_queryset
-                        print("Using broader OR logic results")
-                        print("Note: These results match EITHER name OR party, not necessarily both")
+                        logger.debug("Using broader OR logic results")
+                        logger.debug("Note: These results match EITHER name OR party, not necessarily both")
                     else:
-                        print("No results found with either AND or OR logic")
+                        logger.debug("No results found with either AND or OR logic")
             
             # Handle the case where we have both island and party filters (smart search case)
             elif has_island_filter and has_party_filter:
-                print(f"Smart search case: Island='{data['island']}', Party='{data['party']}'")
+                logger.debug("Smart search case: Island='%s', Party='%s'", data['island'], data['party'])
                 
                 # Reset queryset to all entries since we're doing custom field-based search
                 queryset = PhoneBookEntry.objects.all()
-                print(f"Reset queryset to all entries: {queryset.count()}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Reset queryset to all entries: %s", queryset.count())
                 
                 # For island + party combination, try AND logic first for precise results
                 # If no results, fall back to OR logic for broader results
                 island_term = data['island'].strip()
                 party_term = data['party'].strip()
                 
-                print(f"Searching for island term: '{island_term}' AND party term: '{party_term}'")
-                print(f"First trying AND logic for precise results...")
+                logger.debug("Searching for island term: '%s' AND party term: '%s'", island_term, party_term)
+                logger.debug("First trying AND logic for precise results...")
                 
                 # Debug: Check what exists in the database for these terms
-                print(f"Database check - Entries with island containing '{island_term}': {PhoneBookEntry.objects.filter(island__icontains=island_term).count()}")
-                print(f"Database check - Entries with party containing '{party_term}': {PhoneBookEntry.objects.filter(party__icontains=party_term).count()}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Database check - Entries with island containing '%s': %s", island_term, PhoneBookEntry.objects.filter(island__icontains=island_term).count())
+                    logger.debug("Database check - Entries with party containing '%s': %s", party_term, PhoneBookEntry.objects.filter(party__icontains=party_term).count())
                 
                 # First try: Use AND logic for precise results (narrow scope)
                 island_query = create_wildcard_query('island', island_term)
                 party_query = create_wildcard_query('party', party_term)
                 precise_queryset = queryset.filter(island_query & party_query)
                 
-                print(f"Results after AND logic (precise): {precise_queryset.count()}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Results after AND logic (precise): %s", precise_queryset.count())
                 
                 if precise_queryset.count() > 0:
                     # Use the precise results
                     queryset = precise_queryset
-                    print("Using precise AND logic results")
+                    logger.debug("Using precise AND logic results")
                 else:
                     # No precise results, try OR logic for broader results
-                    print("No precise results found, trying OR logic for broader results...")
+                    logger.debug("No precise results found, trying OR logic for broader results...")
                     
                     broader_queryset = queryset.filter(
                         island_query | party_query
                     )
                     
-                    print(f"Results after OR logic (broader): {broader_queryset.count()}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Results after OR logic (broader): %s", broader_queryset.count())
                     
                     if broader_queryset.count() > 0:
                         queryset = broader_queryset
-                        print("Using broader OR logic results")
-                        print("Note: These results match EITHER island OR party, not necessarily both")
+                        logger.debug("Using broader OR logic results")
+                        logger.debug("Note: These results match EITHER island OR party, not necessarily both")
                     else:
-                        print("No results found with either AND or OR logic")
+                        logger.debug("No results found with either AND or OR logic")
             
             # ONLY process general query if we don't have specific field filters
             # This ensures that specific field searches take priority over general query searches
             elif has_query:
                 query = data['query'].strip()
-                print(f"General query search (no specific field filters): '{query}'")
+                logger.debug("General query search (no specific field filters): '%s'", query)
                 
                 # Enhanced smart search logic for better field detection
                 if query.isdigit():
                     # Numeric query - likely phone number or NID
                     if len(query) >= 7:
                         # 7+ digits - likely phone number
-                        print(f"Query '{query}' appears to be a phone number")
+                        logger.debug("Query '%s' appears to be a phone number", query)
                         queryset = queryset.filter(contact__icontains=query)
                     else:
                         # Shorter numeric - could be NID or phone number
-                        print(f"Query '{query}' is numeric - searching in contact and NID fields")
+                        logger.debug("Query '%s' is numeric - searching in contact and NID fields", query)
                         contact_query = create_wildcard_query('contact', query)
                         nid_query = create_wildcard_query('nid', query)
                         queryset = queryset.filter(
@@ -852,22 +873,22 @@ class PhoneBookEntryViewSet(viewsets.ModelViewSet):
                         )
                 elif query.upper() in ['AP', 'MDP', 'PPM', 'JP', 'MNP', 'ADH', 'PJP']:
                     # Political party abbreviation
-                    print(f"Query '{query}' appears to be a political party")
+                    logger.debug("Query '%s' appears to be a political party", query)
                     party_query = create_wildcard_query('party', query)
                     queryset = queryset.filter(party_query)
                 elif query.upper() in ['MALE', 'FEMALE', 'M', 'F']:
                     # Gender
-                    print(f"Query '{query}' appears to be gender")
+                    logger.debug("Query '%s' appears to be gender", query)
                     gender_query = create_wildcard_query('gender', query)
                     queryset = queryset.filter(gender_query)
                 elif len(query) <= 3 and query.upper() in ['M', 'F', 'S', 'N', 'L', 'B', 'AA', 'ADH', 'HDH', 'TH', 'V', 'HA', 'R']:
                     # Atoll abbreviation
-                    print(f"Query '{query}' appears to be an atoll code")
+                    logger.debug("Query '%s' appears to be an atoll code", query)
                     atoll_query = create_wildcard_query('atoll', query)
                     queryset = queryset.filter(atoll_query)
                 else:
                     # Enhanced text query analysis for better field detection
-                    print(f"Query '{query}' appears to be text - analyzing for specific field types")
+                    logger.debug("Query '%s' appears to be text - analyzing for specific field types", query)
                     
                     # Check if query looks like an address (contains common address indicators)
                     address_indicators = ['ge', 'maa', 'villa', 'house', 'flat', 'room', 'floor', 'block', 'area', 'zone', 'district', 'ward', 'sector', 'street', 'road', 'avenue', 'lane', 'drive', 'place', 'court', 'building', 'apartment', 'habaruge']
@@ -878,7 +899,7 @@ class PhoneBookEntryViewSet(viewsets.ModelViewSet):
                         # Check if query ends with "ge" or contains " ge" (with space)
                         if query.lower().endswith('ge') or ' ge' in query.lower():
                             is_likely_address = True
-                            print(f"Query '{query}' detected as address due to 'ge' suffix pattern")
+                            logger.debug("Query '%s' detected as address due to 'ge' suffix pattern", query)
                     
                     # Check if query looks like an island name (common Maldivian island patterns)
                     island_indicators = ['male', 'addu', 'fuamulah', 'gan', 'fuvahmulah', 'thinadhoo', 'vaadhoo', 'keyodhoo', 'maradhoo', 'feydhoo', 'hithadhoo', 'kudahuvadhoo', 'kulhudhuffushi', 'naifaru', 'dhidhoo', 'hulhumale', 'viligili', 'hulhule', 'villingili']
@@ -890,20 +911,20 @@ class PhoneBookEntryViewSet(viewsets.ModelViewSet):
                     
                     # Apply smart field-specific search based on analysis
                     if is_likely_address:
-                        print(f"Query '{query}' detected as address - searching in address field")
+                        logger.debug("Query '%s' detected as address - searching in address field", query)
                         address_query = create_wildcard_query('address', query)
                         queryset = queryset.filter(address_query)
                     elif is_likely_island:
-                        print(f"Query '{query}' detected as island - searching in island field")
+                        logger.debug("Query '%s' detected as island - searching in island field", query)
                         island_query = create_wildcard_query('island', query)
                         queryset = queryset.filter(island_query)
                     elif is_likely_profession:
-                        print(f"Query '{query}' detected as profession - searching in profession field")
+                        logger.debug("Query '%s' detected as profession - searching in profession field", query)
                         profession_query = create_wildcard_query('profession', query)
                         queryset = queryset.filter(profession_query)
                     else:
                         # Default to comprehensive search across multiple fields
-                        print(f"Query '{query}' - performing comprehensive search across name, address, island, profession, remark")
+                        logger.debug("Query '%s' - performing comprehensive search across name, address, island, profession, remark", query)
                         # Use wildcard-aware queries for comprehensive search
                         name_query = create_wildcard_query('name', query)
                         address_query = create_wildcard_query('address', query)
@@ -914,82 +935,84 @@ class PhoneBookEntryViewSet(viewsets.ModelViewSet):
                             name_query | address_query | island_query | profession_query | remark_query
                         )
                 
-                print(f"Results after general query search: {queryset.count()}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Results after general query search: %s", queryset.count())
             
             # Handle individual field filters if no combinations were processed
             else:
-                print("Processing individual field filters...")
+                logger.debug("Processing individual field filters...")
                 
                 if has_name_filter:
-                    print(f"Filtering by name: '{data['name']}'")
+                    logger.debug("Filtering by name: '%s'", data['name'])
                     name_query = create_wildcard_query('name', data['name'])
                     queryset = queryset.filter(name_query)
                 
                 if has_contact_filter:
-                    print(f"Filtering by contact: '{data['contact']}'")
+                    logger.debug("Filtering by contact: '%s'", data['contact'])
                     contact_query = create_wildcard_query('contact', data['contact'])
                     queryset = queryset.filter(contact_query)
                 
                 if has_nid_filter:
-                    print(f"Filtering by NID: '{data['nid']}'")
+                    logger.debug("Filtering by NID: '%s'", data['nid'])
                     nid_query = create_wildcard_query('nid', data['nid'])
                     queryset = queryset.filter(nid_query)
                 
                 if has_address_filter:
-                    print(f"Filtering by address: '{data['address']}'")
+                    logger.debug("Filtering by address: '%s'", data['address'])
                     address_query = create_wildcard_query('address', data['address'])
                     queryset = queryset.filter(address_query)
                 
                 if has_atoll_filter:
-                    print(f"Filtering by atoll: '{data['atoll']}'")
+                    logger.debug("Filtering by atoll: '%s'", data['atoll'])
                     atoll_query = create_wildcard_query('atoll', data['atoll'])
                     queryset = queryset.filter(atoll_query)
                 
                 if has_island_filter:
-                    print(f"Filtering by island: '{data['island']}'")
+                    logger.debug("Filtering by island: '%s'", data['island'])
                     island_query = create_wildcard_query('island', data['island'])
                     queryset = queryset.filter(island_query)
                 
                 if has_party_filter:
-                    print(f"Filtering by party: '{data['party']}'")
+                    logger.debug("Filtering by party: '%s'", data['party'])
                     party_query = create_wildcard_query('party', data['party'])
                     queryset = queryset.filter(party_query)
                 
                 if has_profession_filter:
-                    print(f"Filtering by profession: '{data['profession']}'")
+                    logger.debug("Filtering by profession: '%s'", data['profession'])
                     profession_query = create_wildcard_query('profession', data['profession'])
                     queryset = queryset.filter(profession_query)
                 
                 if has_gender_filter:
-                    print(f"Filtering by gender: '{data['gender']}'")
+                    logger.debug("Filtering by gender: '%s'", data['gender'])
                     gender_query = create_wildcard_query('gender', data['gender'])
                     queryset = queryset.filter(gender_query)
                 
                 if has_remark_filter:
-                    print(f"Filtering by remark: '{data['remark']}'")
+                    logger.debug("Filtering by remark: '%s'", data['remark'])
                     remark_query = create_wildcard_query('remark', data['remark'])
                     queryset = queryset.filter(remark_query)
                 
                 if has_pep_status_filter:
-                    print(f"Filtering by PEP status: '{data['pep_status']}'")
+                    logger.debug("Filtering by PEP status: '%s'", data['pep_status'])
                     pep_status_query = create_wildcard_query('pep_status', data['pep_status'])
                     queryset = queryset.filter(pep_status_query)
                 
                 if has_min_age_filter:
-                    print(f"Filtering by minimum age: {data['min_age']}")
+                    logger.debug("Filtering by minimum age: %s", data['min_age'])
                     # Convert DOB to age for filtering
                     from datetime import datetime, timedelta
                     cutoff_date = datetime.now() - timedelta(days=data['min_age'] * 365.25)
                     queryset = queryset.filter(DOB__lte=cutoff_date.strftime('%d/%m/%Y'))
                 
                 if has_max_age_filter:
-                    print(f"Filtering by maximum age: {data['max_age']}")
+                    logger.debug("Filtering by maximum age: %s", data['max_age'])
                     # Convert DOB to age for filtering
                     from datetime import datetime, timedelta
                     cutoff_date = datetime.now() - timedelta(days=data['max_age'] * 365.25)
                     queryset = queryset.filter(DOB__gte=cutoff_date.strftime('%d/%m/%Y'))
                 
-                print(f"Results after individual field filters: {queryset.count()}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Results after individual field filters: %s", queryset.count())
             
             # Pagination
             page = data.get('page', 1)
@@ -1000,9 +1023,9 @@ class PhoneBookEntryViewSet(viewsets.ModelViewSet):
             total_count = queryset.count()
             results = queryset[start:end]
             
-            print(f"Final search results: {total_count} total entries")
-            if total_count > 0:
-                print(f"Sample entries: {[{'name': r.name, 'party': r.party, 'contact': r.contact} for r in results[:3]]}")
+            logger.debug("Final search results: %s total entries", total_count)
+            if total_count > 0 and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Sample entries: %s", [{'name': r.name, 'party': r.party, 'contact': r.contact} for r in results[:3]])
             
             serializer = PhoneBookEntrySerializer(results, many=True)
             
@@ -1036,9 +1059,9 @@ class PhoneBookEntryViewSet(viewsets.ModelViewSet):
                             'code': 'POINTS_DEDUCTION_FAILED'
                         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
                     
-                    print(f"Deducted {points_to_deduct} point from user {request.user.username}. New balance: {request.user.score}")
-                except Exception as e:
-                    print(f"Error deducting points: {str(e)}")
+                    logger.debug("Deducted %s point from user %s. New balance: %s", points_to_deduct, request.user.username, request.user.score)
+                except Exception:
+                    logger.exception("Error deducting points")
                     # Continue with the search even if points deduction fails
             
             # Get points information for response
@@ -1061,10 +1084,8 @@ class PhoneBookEntryViewSet(viewsets.ModelViewSet):
                 'threshold_required': threshold
             })
             
-        except Exception as e:
-            print(f"Error in advanced_search: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error in advanced_search")
             return Response(
                 {'error': 'Internal server error during search'}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -1082,11 +1103,19 @@ class PhoneBookEntryViewSet(viewsets.ModelViewSet):
         entry_ids = data['entry_ids']
         
         if operation == 'delete':
-            PhoneBookEntry.objects.filter(id__in=entry_ids).delete()
+            # PhoneBookEntry is keyed by pid; it has no id field
+            PhoneBookEntry.objects.filter(pid__in=entry_ids).delete()
             message = f'Deleted {len(entry_ids)} entries'
         elif operation == 'update_status':
             update_data = data.get('update_data', {})
-            PhoneBookEntry.objects.filter(id__in=entry_ids).update(**update_data)
+            entries = PhoneBookEntry.objects.filter(pid__in=entry_ids)
+            # QuerySet.update() sends no save signals, so clear cached family inference for every
+            # address the entries lived at before and after the update
+            addresses = set(entries.values_list('address', 'island'))
+            entries.update(**update_data)
+            addresses.update(entries.values_list('address', 'island'))
+            for address, island in addresses:
+                FamilyGroup.forget_inference(address, island)
             message = f'Updated {len(entry_ids)} entries'
         else:
             return Response({'error': 'Invalid operation'}, status=status.HTTP_400_BAD_REQUEST)
@@ -1190,18 +1219,21 @@ class PhoneBookEntryViewSet(viewsets.ModelViewSet):
             queryset = PhoneBookEntry.objects.exclude(image_status__isnull=True).exclude(image_status='0')
             
             # Debug: Log the search parameters
-            print(f"Premium image search - Query: '{query}', Party: '{party}', PEP only: {pep_only}, Status: '{status}'")
-            print(f"Initial queryset count (entries with images): {queryset.count()}")
+            logger.debug("Premium image search - Query: '%s', Party: '%s', PEP only: %s, Status: '%s'", query, party, pep_only, status)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Initial queryset count (entries with images): %s", queryset.count())
             
             # Apply status filter if requested (2025-01-28: Added status filtering)
             if status:
                 queryset = queryset.filter(status=status)
-                print(f"Filtered by status '{status}': {queryset.count()} entries")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Filtered by status '%s': %s entries", status, queryset.count())
             
             # Apply PEP filter if requested
             if pep_only:
                 queryset = queryset.filter(pep_status='1')  # 1 means PEP in your data
-                print(f"Filtered by PEP status: {queryset.count()} entries")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Filtered by PEP status: %s entries", queryset.count())
             
             # Apply search filters
             if query:
@@ -1226,10 +1258,11 @@ class PhoneBookEntryViewSet(viewsets.ModelViewSet):
                 queryset = queryset.filter(island_query)
             
             if party:
-                print(f"Filtering by party: '{party}'")
+                logger.debug("Filtering by party: '%s'", party)
                 party_query = create_wildcard_query('party', party)
                 party_filtered = queryset.filter(party_query)
-                print(f"Entries with party '{party}': {party_filtered.count()}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Entries with party '%s': %s", party, party_filtered.count())
                 queryset = party_filtered
             
             if profession:
@@ -1245,9 +1278,9 @@ class PhoneBookEntryViewSet(viewsets.ModelViewSet):
             total_count = queryset.count()
             results = queryset[start:end]
             
-            print(f"Final results count: {total_count}")
-            if total_count > 0:
-                print(f"Sample entries: {[{'name': r.name, 'party': r.party} for r in results[:3]]}")
+            logger.debug("Final results count: %s", total_count)
+            if total_count > 0 and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Sample entries: %s", [{'name': r.name, 'party': r.party} for r in results[:3]])
             
             # Serialize with image information
             from .serializers import PhoneBookEntryWithImageSerializer
@@ -1283,9 +1316,9 @@ class PhoneBookEntryViewSet(viewsets.ModelViewSet):
                             'code': 'POINTS_DEDUCTION_FAILED'
                         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
                     
-                    print(f"Deducted {points_to_deduct} points from user {request.user.username}. New balance: {request.user.score}")
-                except Exception as e:
-                    print(f"Error deducting points: {str(e)}")
+                    logger.debug("Deducted %s points from user %s. New balance: %s", points_to_deduct, request.user.username, request.user.score)
+                except Exception:
+                    logger.exception("Error deducting points")
                     # Continue with the search even if points deduction fails
             
             # Get points information for response
@@ -1336,7 +1369,7 @@ class ImageViewSet(viewsets.ModelViewSet):
 # Family Management Views
 class FamilyGroupViewSet(viewsets.ModelViewSet):
     """Family group management viewset"""
-    queryset = FamilyGroup.objects.all()
+    queryset = FamilyGroup.objects.with_member_counts()
     serializer_class = FamilyGroupSerializer
     permission_classes = [CanManageFamily]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
@@ -1353,6 +1386,23 @@ class FamilyMemberViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['family_group', 'relationship_type', 'is_primary']
+    
+    def perform_create(self, serializer):
+        member = serializer.save()
+        FamilyGroup.forget_inference(member.family_group.address, member.family_group.island)
+    
+    def perform_update(self, serializer):
+        # The member may move to another group, so the group it leaves is forgotten as well
+        previous_group = serializer.instance.family_group
+        member = serializer.save()
+        FamilyGroup.forget_inference(previous_group.address, previous_group.island)
+        if member.family_group_id != previous_group.id:
+            FamilyGroup.forget_inference(member.family_group.address, member.family_group.island)
+    
+    def perform_destroy(self, instance):
+        family_group = instance.family_group
+        instance.delete()
+        FamilyGroup.forget_inference(family_group.address, family_group.island)
 
 # Moderation Views
 class PendingChangeViewSet(viewsets.ModelViewSet):
@@ -1442,14 +1492,11 @@ class AnalyticsViewSet(viewsets.ViewSet):
     def list(self, request):
         """Get basic analytics overview"""
         # 2025-01-28: DEBUG - Log request details
-        print(f"=== ANALYTICS DEBUG ===")
-        print(f"DEBUG: User authenticated: {request.user.is_authenticated}")
-        print(f"DEBUG: User username: {request.user.username}")
-        print(f"DEBUG: User is_superuser: {request.user.is_superuser}")
-        print(f"DEBUG: User is_staff: {request.user.is_staff}")
-        print(f"DEBUG: User user_type: {getattr(request.user, 'user_type', 'N/A')}")
-        print(f"DEBUG: Request headers: {dict(request.headers)}")
-        print(f"=== END ANALYTICS DEBUG ===")
+        logger.debug(
+            "Analytics request - authenticated: %s, username: %s, superuser: %s, staff: %s, user_type: %s",
+            request.user.is_authenticated, request.user.username, request.user.is_superuser,
+            request.user.is_staff, getattr(request.user, 'user_type', 'N/A')
+        )
         
         try:
             # Basic statistics
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-16 19:05
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dirReactFinal_directory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='phonebookentry',
+            index=models.Index(django.db.models.functions.text.Lower('address'), django.db.models.functions.text.Lower('island'), name='pbe_addr_isl_lower'),
+        ),
+    ]
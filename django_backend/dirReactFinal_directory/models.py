@@ -2,8 +2,50 @@
 # Based on existing Flask PhoneBookEntry and Image models
 
 from django.db import models
+from django.db.models.functions import Lower
 from django.core.validators import FileExtensionValidator
+from datetime import date, datetime
 import os
+import re
+
+# d/m/yyyy DOBs without zero padding - the same shapes strptime('%d/%m/%Y') accepted
+DOB_PATTERN = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})', re.ASCII)
+
+def calculate_age(dob, today=None):
+    """
+    Calculate age in whole years from a DOB string (dd/mm/yyyy)
+    Returns None when the DOB is missing or cannot be parsed
+    """
+    if not dob:
+        return None
+    try:
+        # Zero-padded dd/mm/yyyy is the stored format - slice it instead of calling strptime.
+        # int() would also take spaces, signs and underscores, so every slice must be ASCII digits
+        if (len(dob) == 10 and dob[2] == '/' and dob[5] == '/' and dob.isascii()
+                and dob[:2].isdigit() and dob[3:5].isdigit() and dob[6:].isdigit()):
+            dob_date = date(int(dob[6:]), int(dob[3:5]), int(dob[:2]))
+        else:
+            # Unpadded days and months go through one precompiled match instead of strptime
+            match = DOB_PATTERN.fullmatch(dob)
+            if match is None:
+                return None
+            day, month, year = match.groups()
+            dob_date = date(int(year), int(month), int(day))
+        today = today or datetime.now()
+        return today.year - dob_date.year - ((today.month, today.day) < (dob_date.month, dob_date.day))
+    except (TypeError, ValueError):
+        return None
+
+# Non-empty DOB placeholders that mean "no date of birth" in the imported phonebook data
+INVALID_DOB_VALUES = ('None',)
+
+class PhoneBookEntryQuerySet(models.QuerySet):
+    """Custom queryset for phonebook entries"""
+    
+    def with_valid_dob(self):
+        """Entries that have a DOB (not NULL, empty or the literal string 'None')"""
+        # DOB > '' rules out NULL and the empty string in one predicate
+        return self.filter(DOB__gt='').exclude(DOB__in=INVALID_DOB_VALUES)
 
 class PhoneBookEntry(models.Model):
     """
@@ -45,6 +87,8 @@ class PhoneBookEntry(models.Model):
     # Family group reference
     family_group_id = models.IntegerField(null=True, blank=True)
     
+    objects = PhoneBookEntryQuerySet.as_manager()
+    
     class Meta:
         db_table = 't1'
         verbose_name = 'Phone Book Entry'
@@ -53,6 +97,8 @@ class PhoneBookEntry(models.Model):
             models.Index(fields=['contact']),
             models.Index(fields=['name']),
             models.Index(fields=['nid']),
+            # Case-insensitive address lookups (family inference) filter on these expressions
+            models.Index(Lower('address'), Lower('island'), name='pbe_addr_isl_lower'),
         ]
     
     def __str__(self):
@@ -60,19 +106,7 @@ class PhoneBookEntry(models.Model):
     
     def get_age(self):
         """Calculate age from DOB if available"""
-        if not self.DOB:
-            return None
-        try:
-            # Handle different date formats
-            if '/' in self.DOB:
-                from datetime import datetime
-                dob = datetime.strptime(self.DOB, '%d/%m/%Y')
-                today = datetime.now()
-                age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-                return age
-        except:
-            return None
-        return None
+        return calculate_age(self.DOB)
 
 class Image(models.Model):
     """
@@ -1,3 +1,38 @@
-from django.test import TestCase
+from datetime import datetime
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from .models import calculate_age
+
+
+class CalculateAgeTestCase(SimpleTestCase):
+    """
+    Test cases for parsing DOB strings into ages
+    """
+
+    today = datetime(2025, 6, 15)
+
+    def test_padded_dob(self):
+        """Zero-padded dd/mm/yyyy counts whole years, before and after the birthday"""
+        self.assertEqual(calculate_age('15/06/1990', self.today), 35)
+        self.assertEqual(calculate_age('16/06/1990', self.today), 34)
+
+    def test_unpadded_dob(self):
+        """Days and months without zero padding parse like the padded form"""
+        self.assertEqual(calculate_age('1/1/1990', self.today), 35)
+        self.assertEqual(calculate_age('5/12/1990', self.today), 34)
+
+    def test_malformed_dob(self):
+        """Spaces, signs, underscores, impossible dates and other shapes are rejected"""
+        for dob in ('01/01/ 199', '01/01/1_99', '01/+1/1990', '31/02/1990', '1990-01-01', '01/01/90', 'None'):
+            with self.subTest(dob=dob):
+                self.assertIsNone(calculate_age(dob, self.today))
+
+    def test_future_dob(self):
+        """A DOB after today gives a negative age, as strptime parsing did"""
+        self.assertEqual(calculate_age('15/06/2030', self.today), -5)
+
+    def test_empty_dob(self):
+        """Missing DOBs have no age"""
+        self.assertIsNone(calculate_age('', self.today))
+        self.assertIsNone(calculate_age(None, self.today))
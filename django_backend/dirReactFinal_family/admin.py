@@ -5,6 +5,27 @@ from django.contrib import admin
 from django.utils.html import format_html
 from .models import FamilyGroup, FamilyRelationship, FamilyMember
 
+class ForgetInferenceAdminMixin:
+    """Drop the cached inference of every family group a member or relationship edit touches"""
+    
+    def save_model(self, request, obj, form, change):
+        # The form has already assigned any new group to obj, so the stored one comes from form.initial
+        group_ids = {obj.family_group_id, form.initial.get('family_group') if change else None}
+        super().save_model(request, obj, form, change)
+        for address, island in FamilyGroup.objects.filter(pk__in=group_ids - {None}).values_list('address', 'island'):
+            FamilyGroup.forget_inference(address, island)
+    
+    def delete_model(self, request, obj):
+        family_group = obj.family_group
+        super().delete_model(request, obj)
+        FamilyGroup.forget_inference(family_group.address, family_group.island)
+    
+    def delete_queryset(self, request, queryset):
+        addresses = set(queryset.values_list('family_group__address', 'family_group__island'))
+        super().delete_queryset(request, queryset)
+        for address, island in addresses:
+            FamilyGroup.forget_inference(address, island)
+
 @admin.register(FamilyGroup)
 class FamilyGroupAdmin(admin.ModelAdmin):
     """Admin for FamilyGroup model"""
@@ -27,6 +48,10 @@ class FamilyGroupAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        """Count members in the changelist query rather than once per row"""
+        return super().get_queryset(request).with_member_counts()
+    
     def member_count(self, obj):
         """Display member count with color coding"""
         count = obj.get_member_count()
@@ -44,9 +69,10 @@ class FamilyGroupAdmin(admin.ModelAdmin):
     member_count.short_description = 'Members'
 
 @admin.register(FamilyRelationship)
-class FamilyRelationshipAdmin(admin.ModelAdmin):
+class FamilyRelationshipAdmin(ForgetInferenceAdminMixin, admin.ModelAdmin):
     """Admin for FamilyRelationship model"""
     list_display = ['person1_name', 'relationship_type', 'person2_name', 'family_group_name', 'is_active', 'created_at']
+    list_select_related = ['person1', 'person2', 'family_group']
     list_filter = ['relationship_type', 'is_active', 'created_at', 'family_group']
     search_fields = ['person1__name', 'person2__name', 'family_group__name', 'notes']
     readonly_fields = ['created_at', 'updated_at']
@@ -121,9 +147,10 @@ class FamilyRelationshipAdmin(admin.ModelAdmin):
     relationship_type.short_description = 'Relationship Type'
 
 @admin.register(FamilyMember)
-class FamilyMemberAdmin(admin.ModelAdmin):
+class FamilyMemberAdmin(ForgetInferenceAdminMixin, admin.ModelAdmin):
     """Admin for FamilyMember model"""
     list_display = ['entry_name', 'family_group_name', 'role_in_family', 'joined_at']
+    list_select_related = ['entry', 'family_group']
     list_filter = ['role_in_family', 'joined_at', 'family_group']
     search_fields = ['entry__name', 'family_group__name', 'role_in_family']
     readonly_fields = ['joined_at']
@@ -7,3 +7,7 @@ class DirReactFinalFamilyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dirReactFinal_family'
     verbose_name = 'dirReactFinal Family'
+    
+    def ready(self):
+        """Connect the phonebook signals that clear cached family inference"""
+        import dirReactFinal_family.signals
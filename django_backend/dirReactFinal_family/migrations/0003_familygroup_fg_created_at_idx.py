@@ -0,0 +1,19 @@
+# Generated by Django 5.0.2 on 2026-10-16 18:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dirReactFinal_family', '0002_familygroup_is_manually_updated'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='familygroup',
+            index=models.Index(fields=['-created_at'], name='fg_created_at_idx'),
+        ),
+    ]
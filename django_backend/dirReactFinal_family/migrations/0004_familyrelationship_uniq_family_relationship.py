@@ -0,0 +1,22 @@
+# Generated by Django 5.0.2 on 2026-10-16 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dirReactFinal_directory', '0001_initial'),
+        ('dirReactFinal_family', '0003_familygroup_fg_created_at_idx'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='familyrelationship',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='familyrelationship',
+            constraint=models.UniqueConstraint(fields=('family_group', 'person1', 'person2', 'relationship_type'), name='uniq_family_relationship'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.2 on 2026-10-16 19:05
+
+from django.db import migrations
+from django.db.models import Exists, F, OuterRef
+
+# Relationship types that read the same in both directions
+SYMMETRIC_TYPES = ['sibling', 'spouse', 'cousin']
+
+
+def dedupe_reciprocal_relationships(apps, schema_editor):
+    """Drop stored reverse rows whose canonical counterpart exists in the same family"""
+    FamilyRelationship = apps.get_model('dirReactFinal_family', 'FamilyRelationship')
+
+    def reverse_of(relationship_type):
+        return FamilyRelationship.objects.filter(
+            family_group_id=OuterRef('family_group_id'),
+            person1_id=OuterRef('person2_id'),
+            person2_id=OuterRef('person1_id'),
+            relationship_type=relationship_type,
+        )
+
+    # child -> parent rows are implied by the parent -> child row
+    FamilyRelationship.objects.filter(relationship_type='child').filter(
+        Exists(reverse_of('parent'))
+    ).delete()
+
+    # Symmetric pairs keep the row with the lower pid first
+    for relationship_type in SYMMETRIC_TYPES:
+        FamilyRelationship.objects.filter(
+            relationship_type=relationship_type,
+            person1_id__gt=F('person2_id'),
+        ).filter(Exists(reverse_of(relationship_type))).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dirReactFinal_family', '0004_familyrelationship_uniq_family_relationship'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_reciprocal_relationships, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,70 @@
 # 2025-01-27: Family tree models for dirReactFinal migration project
 # Based on existing Flask family tree functionality
 
-from django.db import models
-from dirReactFinal_directory.models import PhoneBookEntry
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Case, Count, IntegerField, Q, Value, When
+from django.db.models.functions import Lower
+from dirReactFinal_directory.models import PhoneBookEntry, calculate_age
+from collections import defaultdict, namedtuple
+from datetime import datetime
+from functools import reduce
+from itertools import combinations, islice, product
+import hashlib
 import logging
+from operator import or_
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT when bulk-creating inferred relationships
+RELATIONSHIP_BATCH_SIZE = 500
+
+# Rows per INSERT when bulk-creating inferred family members
+MEMBER_BATCH_SIZE = 1000
+
+# Seconds a freshly inferred family is reused for repeat requests on the same address
+INFERENCE_CACHE_TIMEOUT = 300
+
+# Addresses handled per entries query and transaction by bulk inference; each address binds
+# five query parameters, which keeps a full batch under SQLite's default limit of 999
+INFERENCE_BATCH_SIZE = 150
+
+# Rows fetched per round trip while streaming a bulk inference entries query
+ENTRY_CHUNK_SIZE = 2000
+
+# Normalized gender values that identify a male or female parent candidate
+MALE_GENDERS = frozenset({'male', 'm', '1'})
+FEMALE_GENDERS = frozenset({'female', 'f', '2'})
+
+# Lightweight row carried through inference instead of PhoneBookEntry instances
+AgedEntry = namedtuple('AgedEntry', ['pid', 'name', 'gender', 'age'])
+
+def _chunked(iterable, size):
+    """Yield lists of up to size items from any iterable without materializing it"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _pair_key(pair):
+    """Hashable result key for an (address, island) pair - JSON payloads decode pairs as lists"""
+    if isinstance(pair, list):
+        pair = tuple(pair)
+    try:
+        hash(pair)
+    except TypeError:
+        # Still unhashable, so it can never be a valid pair; key its None result by the repr
+        return repr(pair)
+    return pair
+
+class FamilyGroupQuerySet(models.QuerySet):
+    """Custom queryset for family groups"""
+    
+    def with_member_counts(self):
+        """Annotate member_count so listing groups costs one query instead of one COUNT per group"""
+        return self.annotate(member_count=Count('members'))
 
 class FamilyGroup(models.Model):
     """
@@ -21,24 +82,52 @@ class FamilyGroup(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = FamilyGroupQuerySet.as_manager()
+    
     class Meta:
         db_table = 'family_groups'
         verbose_name = 'Family Group'
         verbose_name_plural = 'Family Groups'
         # 2025-01-27: Added unique constraint for address+island combination to prevent duplicates
+        # (its index also serves every address/island lookup)
         unique_together = [['address', 'island']]
+        indexes = [
+            # List views are ordered newest first
+            models.Index(fields=['-created_at'], name='fg_created_at_idx'),
+        ]
     
     def __str__(self):
         return self.name
     
     def get_member_count(self):
         """Get the number of members in this family group"""
+        # Groups loaded through with_member_counts() already carry the count
+        if hasattr(self, 'member_count'):
+            return self.member_count
         return self.members.count()
     
     def mark_as_manually_updated(self):
         """2025-01-28: NEW - Mark this family as manually updated by user"""
         self.is_manually_updated = True
         self.save(update_fields=['is_manually_updated'])
+        self.forget_inference(self.address, self.island)
+    
+    @staticmethod
+    def inference_cache_key(address, island):
+        """Cache key for the last inference result of an address"""
+        digest = hashlib.md5(f"{address}|{island}".lower().encode()).hexdigest()
+        return f"family_inference:{digest}"
+    
+    @classmethod
+    def forget_inference(cls, address, island):
+        """
+        Drop the cached inference result of an address after its members, relationships
+        or phonebook entries change. A cache outage is logged and otherwise ignored.
+        """
+        try:
+            cache.delete(cls.inference_cache_key(address, island))
+        except Exception:
+            logger.warning("Could not clear cached family inference for %s, %s", address, island, exc_info=True)
     
     @classmethod
     def get_by_address(cls, address, island):
@@ -61,258 +150,328 @@ class FamilyGroup(models.Model):
         5. Automatically creates family group and relationships
         6. 2025-01-28: ENHANCED - Preserves manually updated families
         """
-        from django.db import transaction
-        from datetime import datetime
-        from dirReactFinal_directory.models import PhoneBookEntry
-        
-        logger = logging.getLogger(__name__)
-        
         try:
+            # Repeat requests for an address reuse the family inferred moments ago, as long as the
+            # group still exists unchanged; anything else falls through to a full rebuild
+            cache_key = cls.inference_cache_key(address, island)
+            try:
+                cached = cache.get(cache_key)
+            except Exception:
+                logger.warning("Family inference cache unavailable - rebuilding %s, %s", address, island, exc_info=True)
+                cached = None
+            if cached:
+                family_group = cls.objects.filter(pk=cached['pk'], address=address, island=island).first()
+                if family_group and family_group.updated_at == cached['updated_at']:
+                    logger.debug("Reusing cached family inference for %s, %s", address, island)
+                    return family_group
+            
+            # Get all phonebook entries for this address
+            logger.debug("Searching for entries with address='%s' and island='%s'", address, island)
+            
+            # Pull only the columns inference needs as plain tuples instead of full model instances;
+            # entries without a DOB can never be placed in the family so the database drops them
+            # Matching on LOWER() expressions lets the pbe_addr_isl_lower index serve the lookup
+            entries_with_dob = list(PhoneBookEntry.objects.annotate(
+                address_lower=Lower('address'),
+                island_lower=Lower('island')
+            ).filter(
+                address_lower=Lower(Value(address)),
+                island_lower=Lower(Value(island))
+            ).with_valid_dob().values_list('pid', 'name', 'gender', 'DOB'))
+            
+            logger.debug("Found %s entries with DOB", len(entries_with_dob))
+            
+            # Show some sample entries for debugging - skipped entirely unless debug logging is on
+            if logger.isEnabledFor(logging.DEBUG):
+                for pid, name, gender, dob in entries_with_dob[:5]:
+                    logger.debug(
+                        "Sample entry: PID=%s, name='%s', address='%s', island='%s', DOB='%s', gender='%s'",
+                        pid, name, address, island, dob, gender
+                    )
+            
+            # Age parsing is pure Python - finish it before taking the row lock
+            entries_with_age = cls._with_ages(address, island, entries_with_dob)
+            
             with transaction.atomic():
-                # Check if family group already exists
-                existing_family = cls.objects.filter(address=address, island=island).first()
+                # Check if family group already exists - the row stays locked until the rebuild commits
+                # so concurrent inference for the same address waits instead of racing the wipe
+                family_group = cls.objects.select_for_update().filter(address=address, island=island).first()
                 
                 # 2025-01-28: ENHANCED - If family exists and has been manually updated, return it as-is
-                if existing_family and existing_family.is_manually_updated:
-                    logger.info(f"Family for {address}, {island} has been manually updated - preserving existing structure")
-                    return existing_family
-                
-                # Get all phonebook entries for this address
-                logger.info(f"Searching for entries with address='{address}' and island='{island}'")
-                
-                entries = PhoneBookEntry.objects.filter(
-                    address__iexact=address,
-                    island__iexact=island
-                )
-                
-                logger.info(f"Found {entries.count()} total entries for this address/island")
-                
-                # Show some sample entries for debugging
-                for entry in entries[:5]:
-                    logger.info(f"Sample entry: PID={entry.pid}, name='{entry.name}', address='{entry.address}', island='{entry.island}', DOB='{entry.DOB}', gender='{entry.gender}'")
-                
-                # Filter entries with DOB
-                entries_with_dob = entries.exclude(DOB__isnull=True).exclude(DOB__exact='')
-                logger.info(f"Found {entries_with_dob.count()} entries with DOB")
-                
-                if not entries_with_dob.exists():
-                    logger.warning(f"No entries with DOB found for {address}, {island}")
-                    return None
-                
-                # Calculate ages and sort by age (eldest first)
-                entries_with_age = []
-                for entry in entries_with_dob:
-                    age = entry.get_age()
-                    if age is not None:
-                        entries_with_age.append((entry, age))
-                
-                logger.info(f"Found {len(entries_with_age)} entries with valid age calculation")
-                
-                # Sort by age (eldest first)
-                entries_with_age.sort(key=lambda x: x[1], reverse=True)
+                if family_group and family_group.is_manually_updated:
+                    logger.info("Family for %s, %s has been manually updated - preserving existing structure", address, island)
+                    return family_group
                 
                 if not entries_with_age:
-                    logger.warning(f"No entries with valid age found for {address}, {island}")
                     return None
                 
-                # Create or get family group
-                family_group, created = cls.objects.get_or_create(
-                    address=address,
-                    island=island,
-                    defaults={
-                        'name': f"Family at {address}",
-                        'description': f"Family from {address}, {island} (auto-inferred)",
-                        'created_by': created_by,
-                        'is_manually_updated': False  # 2025-01-28: Set as auto-inferred
-                    }
-                )
-                
-                # 2025-01-28: ENHANCED - Only clear existing data if this is a new family or not manually updated
-                if not family_group.is_manually_updated:
-                    # Clear existing members and relationships for this family
-                    family_group.members.all().delete()
-                    family_group.relationships.all().delete()
-                    
-                    # Add all entries as family members
-                    for entry, age in entries_with_age:
-                        FamilyMember.objects.create(
-                            entry=entry,
-                            family_group=family_group,
-                            role_in_family='member'
-                        )
-                    
-                    # Identify potential parents (eldest male and female with DOB)
-                    potential_parents = []
-                    for entry, age in entries_with_age:
-                        if entry.gender and entry.DOB:
-                            potential_parents.append((entry, age))
-                    
-                    # Sort potential parents by age (eldest first)
-                    potential_parents.sort(key=lambda x: x[1], reverse=True)
-                    
-                    # Find eldest male and female
-                    eldest_male = None
-                    eldest_female = None
-                    
-                    for entry, age in potential_parents:
-                        if entry.gender.lower() in ['male', 'm', '1'] and eldest_male is None:
-                            eldest_male = (entry, age)
-                        elif entry.gender.lower() in ['female', 'f', '2'] and eldest_female is None:
-                            eldest_female = (entry, age)
-                        
-                        if eldest_male and eldest_female:
-                            break
-                    
-                    # Create parent relationships
-                    parents = []
-                    if eldest_male:
-                        parents.append(eldest_male)
-                        # Update role to parent
-                        FamilyMember.objects.filter(
-                            entry=eldest_male[0],
-                            family_group=family_group
-                        ).update(role_in_family='parent')
-                    
-                    if eldest_female:
-                        parents.append(eldest_female)
-                        # Update role to parent
-                        FamilyMember.objects.filter(
-                            entry=eldest_female[0],
-                            family_group=family_group
-                        ).update(role_in_family='parent')
-                    
-                    # Create parent-child relationships based on age gap
-                    for entry, age in entries_with_age:
-                        # Skip if this is a parent
-                        if any(entry.pid == parent[0].pid for parent in parents):
-                            continue
-                        
-                        # Find suitable parent(s) with at least 10 year age gap
-                        suitable_parents = []
-                        for parent_entry, parent_age in parents:
-                            age_gap = parent_age - age
-                            if age_gap >= 10:  # At least 10 year age gap
-                                suitable_parents.append(parent_entry)
-                        
-                        # Create parent-child relationships
-                        for parent_entry in suitable_parents:
-                            # Check if relationship already exists to avoid duplicates
-                            existing_rel = FamilyRelationship.objects.filter(
-                                person1=parent_entry,
-                                person2=entry,
-                                relationship_type='parent',
-                                family_group=family_group
-                            ).first()
-                            
-                            if not existing_rel:
-                                # Create parent -> child relationship
-                                FamilyRelationship.objects.create(
-                                    person1=parent_entry,
-                                    person2=entry,
-                                    relationship_type='parent',
-                                    family_group=family_group,
-                                    notes=f"Auto-inferred: {parent_entry.name} -> {entry.name} (age gap: {parent_entry.get_age() - age} years)"
-                                )
-                            
-                            # Check if reverse relationship exists
-                            existing_reverse_rel = FamilyRelationship.objects.filter(
-                                person1=entry,
-                                person2=parent_entry,
-                                relationship_type='child',
-                                family_group=family_group
-                            ).first()
-                            
-                            if not existing_reverse_rel:
-                                # Create child -> parent relationship (reciprocal)
-                                FamilyRelationship.objects.create(
-                                    person1=entry,
-                                    person2=parent_entry,
-                                    relationship_type='child',
-                                    family_group=family_group,
-                                    notes=f"Auto-inferred: {entry.name} -> {parent_entry.name} (age gap: {parent_entry.get_age() - age} years)"
-                                )
-                            
-                            # Update child role
-                            FamilyMember.objects.filter(
-                                entry=entry,
-                                family_group=family_group
-                            ).update(role_in_family='child')
-                    
-                    # Create sibling relationships for children
-                    children = FamilyMember.objects.filter(
-                        family_group=family_group,
-                        role_in_family='child'
+                family_group = cls._infer_from_entries(family_group, address, island, entries_with_age, created_by)
+            
+            # Cached only once the rebuild has committed
+            if family_group is not None:
+                try:
+                    cache.set(
+                        cache_key,
+                        {'pk': family_group.pk, 'updated_at': family_group.updated_at},
+                        INFERENCE_CACHE_TIMEOUT
                     )
-                    
-                    if children.count() > 1:
-                        # Group children by their parents
-                        from collections import defaultdict
-                        parent_children = defaultdict(list)
-                        
-                        for child in children:
-                            # Find parents of this child
-                            parent_relationships = FamilyRelationship.objects.filter(
-                                person2=child.entry,
-                                relationship_type='parent',
-                                family_group=family_group
-                            )
-                            
-                            for parent_rel in parent_relationships:
-                                parent_children[parent_rel.person1.pid].append(child.entry)
-                        
-                        # Create sibling relationships
-                        for parent_pid, children_list in parent_children.items():
-                            if len(children_list) > 1:
-                                # Create sibling relationships between all children of the same parent
-                                for i, child1 in enumerate(children_list):
-                                    for child2 in children_list[i+1:]:
-                                        # Check if sibling relationship already exists
-                                        existing_sibling = FamilyRelationship.objects.filter(
-                                            person1=child1,
-                                            person2=child2,
-                                            relationship_type='sibling',
-                                            family_group=family_group
-                                        ).first()
-                                        
-                                        if not existing_sibling:
-                                            # Create bidirectional sibling relationships
-                                            FamilyRelationship.objects.create(
-                                                person1=child1,
-                                                person2=child2,
-                                                relationship_type='sibling',
-                                                family_group=family_group,
-                                                notes=f"Auto-inferred: {child1.name} and {child2.name} are siblings"
-                                            )
-                                        
-                                        # Check if reverse relationship exists
-                                        existing_reverse_sibling = FamilyRelationship.objects.filter(
-                                            person1=child2,
-                                            person2=child1,
-                                            relationship_type='sibling',
-                                            family_group=family_group
-                                        ).first()
-                                        
-                                        if not existing_reverse_sibling:
-                                            FamilyRelationship.objects.create(
-                                                person1=child2,
-                                                person2=child1,
-                                                relationship_type='sibling',
-                                                family_group=family_group,
-                                                notes=f"Auto-inferred: {child2.name} and {child1.name} are siblings"
-                                            )
-                else:
-                    logger.info(f"Family for {address}, {island} is manually updated - skipping auto-inference")
-                
-                print(f"DEBUG: Auto-inferred family for {address}, {island}")
-                print(f"DEBUG: Total members: {family_group.members.count()}")
-                print(f"DEBUG: Total relationships: {family_group.relationships.count()}")
-                print(f"DEBUG: Is manually updated: {family_group.is_manually_updated}")
+                except Exception:
+                    logger.warning("Could not cache family inference for %s, %s", address, island, exc_info=True)
+            return family_group
                 
+        except Exception:
+            logger.exception("Failed to infer family for %s, %s", address, island)
+            return None
+
+    @classmethod
+    def infer_families_bulk(cls, pairs, created_by, batch_size=INFERENCE_BATCH_SIZE):
+        """
+        Infer families for many (address, island) pairs, one entries query per batch.
+
+        pairs may be any iterable, including a generator over a large address list; it is
+        consumed batch_size pairs at a time. Returns a dict mapping each pair to its family
+        group, or None where inference produced nothing; list pairs are keyed as tuples.
+        """
+        results = {}
+        for chunk in _chunked(map(_pair_key, pairs), batch_size):
+            batch = [pair for pair in dict.fromkeys(chunk) if pair not in results]
+            if batch:
+                results.update(cls._infer_batch(batch, created_by))
+        return results
+    
+    @classmethod
+    def _infer_batch(cls, pairs, created_by):
+        """
+        Infer one batch of distinct (address, island) pairs with a single entries query.
+
+        The batch shares one transaction; each address runs in its own savepoint so one
+        failure does not roll back the rest of the batch.
+        """
+        # Validate each pair on its own so one bad pair is reported as None instead of failing
+        # the batch. The entries query tags each row with the first pair it matches, so pairs
+        # spelled the same apart from case go to a follow-up query rather than sharing one
+        results = {}
+        batch = []
+        deferred = []
+        folded_pairs = set()
+        for pair in pairs:
+            try:
+                address, island = pair
+            except (TypeError, ValueError):
+                address = island = None
+            if not isinstance(address, str) or not isinstance(island, str):
+                logger.warning("Skipping invalid address/island pair %r", pair)
+                results[pair] = None
+                continue
+            folded = (address.lower(), island.lower())
+            if folded in folded_pairs:
+                deferred.append(pair)
+                continue
+            folded_pairs.add(folded)
+            batch.append(pair)
+        
+        # One query for every address in the batch. Matching uses LOWER() on both sides exactly
+        # like the single-address lookup, and the CASE tells which pair each row belongs to.
+        # The rows are only read once, so they are streamed rather than cached on the queryset
+        entries_by_index = defaultdict(list)
+        if batch:
+            matches = [
+                Q(address_lower=Lower(Value(address)), island_lower=Lower(Value(island)))
+                for address, island in batch
+            ]
+            rows = PhoneBookEntry.objects.annotate(
+                address_lower=Lower('address'),
+                island_lower=Lower('island')
+            ).annotate(
+                pair_index=Case(
+                    *[When(match, then=Value(index)) for index, match in enumerate(matches)],
+                    output_field=IntegerField()
+                )
+            ).filter(reduce(or_, matches)).with_valid_dob().values_list('pair_index', 'pid', 'name', 'gender', 'DOB')
+            for index, pid, name, gender, dob in rows.iterator(chunk_size=ENTRY_CHUNK_SIZE):
+                entries_by_index[index].append((pid, name, gender, dob))
+        
+        # Compute ages for every address before the transaction so no row lock waits on parsing
+        ranked_by_key = {
+            (address, island): cls._with_ages(address, island, entries_by_index.get(index, []))
+            for index, (address, island) in enumerate(batch)
+        }
+        
+        with transaction.atomic():
+            # Lock and load every existing group of the batch in one query instead of one probe per
+            # address; the __in filters may also match other combinations, which are never looked up
+            existing_by_key = {
+                (family_group.address, family_group.island): family_group
+                for family_group in cls.objects.select_for_update().filter(
+                    address__in={address for address, island in batch},
+                    island__in={island for address, island in batch}
+                )
+            }
+            for address, island in batch:
+                try:
+                    with transaction.atomic():
+                        family_group = existing_by_key.get((address, island))
+                        if family_group and family_group.is_manually_updated:
+                            results[(address, island)] = family_group
+                            continue
+                        entries_with_age = ranked_by_key[(address, island)]
+                        results[(address, island)] = cls._infer_from_entries(
+                            family_group, address, island, entries_with_age, created_by
+                        ) if entries_with_age else None
+                except Exception:
+                    logger.exception("Failed to infer family for %s, %s", address, island)
+                    results[(address, island)] = None
+        if deferred:
+            results.update(cls._infer_batch(deferred, created_by))
+        return results
+    
+    @staticmethod
+    def _with_ages(address, island, entries_with_dob):
+        """
+        Turn (pid, name, gender, DOB) rows into AgedEntry tuples.
+
+        Rows whose DOB cannot be parsed are dropped; no database access happens here.
+        """
+        if not entries_with_dob:
+            logger.warning("No entries with DOB found for %s, %s", address, island)
+            return []
+        
+        # Calculate ages once; parents are picked by a single scan later, so no sort is needed
+        today = datetime.now()
+        entries_with_age = []
+        for pid, name, gender, dob in entries_with_dob:
+            age = calculate_age(dob, today)
+            if age is not None:
+                entries_with_age.append(AgedEntry(pid, name, gender, age))
+        
+        logger.debug("Found %s entries with valid age calculation", len(entries_with_age))
+        
+        if not entries_with_age:
+            logger.warning("No entries with valid age found for %s, %s", address, island)
+        return entries_with_age
+    
+    @classmethod
+    def _infer_from_entries(cls, family_group, address, island, entries_with_age, created_by):
+        """
+        Rebuild one address' family from AgedEntry tuples.
+
+        family_group is the locked existing group or None; callers have already
+        preserved manually updated families and run this inside a transaction.
+        """
+        # Create the family group unless the lookup above already found it. There was no row to
+        # lock, so a concurrent request may insert the group first; get_or_create then re-reads
+        # it under the lock instead of failing on the address/island unique constraint
+        if family_group is None:
+            family_group, created = cls.objects.select_for_update().get_or_create(
+                address=address,
+                island=island,
+                defaults={
+                    'name': f"Family at {address}",
+                    'description': f"Family from {address}, {island} (auto-inferred)",
+                    'created_by': created_by,
+                    'is_manually_updated': False  # 2025-01-28: Set as auto-inferred
+                }
+            )
+            if not created and family_group.is_manually_updated:
+                logger.info("Family for %s, %s has been manually updated - preserving existing structure", address, island)
                 return family_group
+        
+        # Clear existing members and relationships for this family
+        family_group.members.all().delete()
+        family_group.relationships.all().delete()
+        
+        # Single pass over the entries: build each family member (unsaved - roles are settled in
+        # memory before the insert), index names for the relationship notes and track the eldest
+        # male and female (on equal ages the first wins)
+        members = {}
+        names = {}
+        eldest_male = None
+        eldest_female = None
+        
+        for entry in entries_with_age:
+            pid, name, gender, age = entry
+            members[pid] = FamilyMember(
+                entry_id=pid,
+                family_group=family_group,
+                role_in_family='member'
+            )
+            names[pid] = name
+            
+            if not gender:
+                continue
+            gender = gender.lower()
+            if gender in MALE_GENDERS:
+                if eldest_male is None or age > eldest_male.age:
+                    eldest_male = entry
+            elif gender in FEMALE_GENDERS:
+                if eldest_female is None or age > eldest_female.age:
+                    eldest_female = entry
+        
+        # Create parent relationships
+        parents = [parent for parent in (eldest_male, eldest_female) if parent]
+        for parent in parents:
+            members[parent.pid].role_in_family = 'parent'
+        
+        # Create parent-child relationships based on age gap; every relationship is collected
+        # in memory and written with a single bulk insert at the end
+        parent_pids = {parent.pid for parent in parents}
+        non_parents = [entry for entry in entries_with_age if entry.pid not in parent_pids]
+        new_relationships = []
+        parent_children = defaultdict(list)
+        for (parent_pid, parent_name, parent_gender, parent_age), (pid, name, gender, age) in product(parents, non_parents):
+            # Parents to children need at least 10 year age gap
+            age_gap = parent_age - age
+            if age_gap < 10:
+                continue
+            
+            # Only the canonical parent -> child row is stored; the child -> parent side
+            # is derived with get_reciprocal_relationship() when reading
+            new_relationships.append(FamilyRelationship(
+                person1_id=parent_pid,
+                person2_id=pid,
+                relationship_type='parent',
+                family_group=family_group,
+                notes=f"Auto-inferred: {parent_name} -> {name} (age gap: {age_gap} years)"
+            ))
+            parent_children[parent_pid].append(pid)
+            members[pid].role_in_family = 'child'
+        
+        # Members were cleared above, so one bulk insert adds the whole household with final roles
+        FamilyMember.objects.bulk_create(members.values(), batch_size=MEMBER_BATCH_SIZE, ignore_conflicts=True)
+        
+        # Create sibling relationships between all children of the same parent - children
+        # sharing both parents appear in two groups, so track pairs already queued.
+        # Siblings are symmetric, so one row per pair is stored with the lower pid first
+        sibling_pairs = set()
+        for child_pids in parent_children.values():
+            for child1, child2 in combinations(sorted(child_pids), 2):
+                if (child1, child2) in sibling_pairs:
+                    continue
+                sibling_pairs.add((child1, child2))
                 
-        except Exception as e:
-            print(f"ERROR: Failed to infer family for {address}, {island}: {str(e)}")
-            return None
+                new_relationships.append(FamilyRelationship(
+                    person1_id=child1,
+                    person2_id=child2,
+                    relationship_type='sibling',
+                    family_group=family_group,
+                    notes=f"Auto-inferred: {names[child1]} and {names[child2]} are siblings"
+                ))
+        
+        # Existing relationships were cleared above; the per-family unique constraint lets the
+        # database drop any duplicate row instead of checking each edge first
+        FamilyRelationship.objects.bulk_create(
+            new_relationships,
+            batch_size=RELATIONSHIP_BATCH_SIZE,
+            ignore_conflicts=True
+        )
+        
+        # Summary counts come from the lists just written, so no COUNT queries are needed
+        logger.debug(
+            "Auto-inferred family for %s, %s: %s members, %s relationships",
+            address, island, len(members), len(new_relationships)
+        )
+        
+        return family_group
 
 class FamilyRelationship(models.Model):
     """
@@ -331,6 +490,20 @@ class FamilyRelationship(models.Model):
         ('other', 'Other'),
     ]
     
+    # Relationship type as seen from person2
+    _RECIPROCAL_MAP = {
+        'parent': 'child',
+        'child': 'parent',
+        'spouse': 'spouse',
+        'sibling': 'sibling',
+        'grandparent': 'grandchild',
+        'grandchild': 'grandparent',
+        'aunt_uncle': 'niece_nephew',
+        'niece_nephew': 'aunt_uncle',
+        'cousin': 'cousin',
+        'other': 'other',
+    }
+    
     person1 = models.ForeignKey(PhoneBookEntry, on_delete=models.CASCADE, related_name='relationships_from')
     person2 = models.ForeignKey(PhoneBookEntry, on_delete=models.CASCADE, related_name='relationships_to')
     relationship_type = models.CharField(max_length=20, choices=RELATIONSHIP_TYPES)
@@ -346,7 +519,14 @@ class FamilyRelationship(models.Model):
     
     class Meta:
         db_table = 'family_relationships'
-        unique_together = ['person1', 'person2', 'relationship_type']
+        # Scoped to the family group, matching the serializer's duplicate check, so bulk inserts
+        # can leave deduplication to the database
+        constraints = [
+            models.UniqueConstraint(
+                fields=['family_group', 'person1', 'person2', 'relationship_type'],
+                name='uniq_family_relationship'
+            )
+        ]
         verbose_name = 'Family Relationship'
         verbose_name_plural = 'Family Relationships'
     
@@ -355,19 +535,27 @@ class FamilyRelationship(models.Model):
     
     def get_reciprocal_relationship(self):
         """Get the reciprocal relationship type"""
-        reciprocal_map = {
-            'parent': 'child',
-            'child': 'parent',
-            'spouse': 'spouse',
-            'sibling': 'sibling',
-            'grandparent': 'grandchild',
-            'grandchild': 'grandparent',
-            'aunt_uncle': 'niece_nephew',
-            'niece_nephew': 'aunt_uncle',
-            'cousin': 'cousin',
-            'other': 'other',
-        }
-        return reciprocal_map.get(self.relationship_type, 'other')
+        return self._RECIPROCAL_MAP.get(self.relationship_type, 'other')
+    
+    @classmethod
+    def for_person(cls, pid, family_group=None):
+        """
+        All relationships of one person as (relationship, other_pid, relationship_type) tuples.
+        
+        Only one direction of each relationship is stored, so rows where the person is
+        person2 are reported with the reciprocal type, as seen from that person.
+        """
+        queryset = cls.objects.filter(Q(person1_id=pid) | Q(person2_id=pid))
+        if family_group is not None:
+            queryset = queryset.filter(family_group=family_group)
+        
+        relationships = []
+        for relationship in queryset:
+            if relationship.person1_id == pid:
+                relationships.append((relationship, relationship.person2_id, relationship.relationship_type))
+            else:
+                relationships.append((relationship, relationship.person1_id, relationship.get_reciprocal_relationship()))
+        return relationships
 
 class FamilyMember(models.Model):
     """
@@ -0,0 +1,33 @@
+# Keep cached family inference in step with phonebook edits
+
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from dirReactFinal_directory.models import PhoneBookEntry
+from .models import FamilyGroup
+
+@receiver(post_init, sender=PhoneBookEntry)
+def remember_loaded_address(sender, instance, **kwargs):
+    """Record the address an entry was loaded with so a move is detected without a query"""
+    # Read __dict__ directly - touching a deferred field would cost one query per loaded row
+    fields = instance.__dict__
+    if 'address' in fields and 'island' in fields:
+        instance._loaded_address = (fields['address'], fields['island'])
+
+@receiver(pre_save, sender=PhoneBookEntry)
+def forget_previous_address_inference(sender, instance, raw=False, update_fields=None, **kwargs):
+    """An entry moving away changes the family at its old address too"""
+    if raw or instance._state.adding or (update_fields is not None and not {'address', 'island'} & set(update_fields)):
+        return
+    previous = instance.__dict__.get('_loaded_address')
+    if previous is None:
+        # Loaded with the address deferred, so the stored value is only known to the database
+        previous = sender.objects.filter(pk=instance.pk).values_list('address', 'island').first()
+    if previous and previous != (instance.address, instance.island):
+        FamilyGroup.forget_inference(*previous)
+
+@receiver(post_save, sender=PhoneBookEntry)
+@receiver(post_delete, sender=PhoneBookEntry)
+def forget_address_inference(sender, instance, **kwargs):
+    """Any change to a resident invalidates the cached family of their address"""
+    FamilyGroup.forget_inference(instance.address, instance.island)
+    instance._loaded_address = (instance.address, instance.island)
@@ -1,8 +1,10 @@
 # 2025-01-28: Tests for family functionality including delete_updated_families
 
 from django.test import TestCase
+from django.core.cache import cache
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from unittest import mock
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from .models import FamilyGroup, FamilyMember, FamilyRelationship
@@ -262,3 +264,386 @@ class DeleteUpdatedFamiliesTestCase(APITestCase):
         self.assertEqual(entry3_after.phone, original_entry3.phone)
         self.assertEqual(entry3_after.address, original_entry3.address)
         self.assertEqual(entry3_after.island, original_entry3.island)
+
+
+class InferFamilyFromAddressTestCase(TestCase):
+    """
+    Test cases for automatic family inference from address
+    """
+    
+    def setUp(self):
+        """Set up a household with two parents, two children and one entry without DOB"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='inferrer',
+            email='inferrer@test.com',
+            password='testpass123'
+        )
+        
+        self.father = PhoneBookEntry.objects.create(
+            pid=2001, name='Ali Ahmed', contact='7000001',
+            address='Rose Villa', island='Male', DOB='01/01/1960', gender='M'
+        )
+        self.mother = PhoneBookEntry.objects.create(
+            pid=2002, name='Aisha Ali', contact='7000002',
+            address='Rose Villa', island='Male', DOB='15/06/1965', gender='F'
+        )
+        self.child1 = PhoneBookEntry.objects.create(
+            pid=2003, name='Hassan Ali', contact='7000003',
+            address='Rose Villa', island='Male', DOB='10/03/1990', gender='M'
+        )
+        self.child2 = PhoneBookEntry.objects.create(
+            pid=2004, name='Mariyam Ali', contact='7000004',
+            address='rose villa', island='male', DOB='20/08/1995', gender='F'
+        )
+        self.no_dob = PhoneBookEntry.objects.create(
+            pid=2005, name='Guest', contact='7000005',
+            address='Rose Villa', island='Male', DOB='', gender='M'
+        )
+    
+    def test_infers_parents_children_and_siblings(self):
+        """Eldest male and female become parents of everyone at least 10 years younger"""
+        family_group = FamilyGroup.infer_family_from_address('Rose Villa', 'Male', self.user)
+        
+        self.assertIsNotNone(family_group)
+        self.assertFalse(family_group.is_manually_updated)
+        
+        roles = dict(family_group.members.values_list('entry_id', 'role_in_family'))
+        self.assertEqual(roles, {2001: 'parent', 2002: 'parent', 2003: 'child', 2004: 'child'})
+        
+        relationships = set(family_group.relationships.values_list('person1_id', 'person2_id', 'relationship_type'))
+        for parent in (2001, 2002):
+            for child in (2003, 2004):
+                self.assertIn((parent, child, 'parent'), relationships)
+        self.assertIn((2003, 2004, 'sibling'), relationships)
+        
+        # Only the canonical direction is stored; reciprocals are derived when reading
+        self.assertNotIn((2004, 2003, 'sibling'), relationships)
+        self.assertFalse(any(rel_type == 'child' for _, _, rel_type in relationships))
+    
+    def test_rerun_rebuilds_without_duplicates(self):
+        """Running inference twice rebuilds the same family instead of duplicating it"""
+        first = FamilyGroup.infer_family_from_address('Rose Villa', 'Male', self.user)
+        relationship_count = first.relationships.count()
+        
+        # Force a full rebuild rather than the cached result
+        cache.clear()
+        second = FamilyGroup.infer_family_from_address('Rose Villa', 'Male', self.user)
+        
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(FamilyGroup.objects.filter(address='Rose Villa', island='Male').count(), 1)
+        self.assertEqual(second.members.count(), 4)
+        self.assertEqual(second.relationships.count(), relationship_count)
+    
+    def test_for_person_derives_reciprocal_relationships(self):
+        """Relationships stored in one direction are reported from both sides"""
+        family_group = FamilyGroup.infer_family_from_address('Rose Villa', 'Male', self.user)
+        
+        child_view = {(other, rel_type) for _, other, rel_type in FamilyRelationship.for_person(2004, family_group)}
+        
+        self.assertEqual(child_view, {(2001, 'child'), (2002, 'child'), (2003, 'sibling')})
+    
+    def test_member_counts_come_from_the_annotation(self):
+        """Groups loaded with with_member_counts() report their size without another query"""
+        family_group = FamilyGroup.infer_family_from_address('Rose Villa', 'Male', self.user)
+        
+        with self.assertNumQueries(1):
+            annotated = FamilyGroup.objects.with_member_counts().get(pk=family_group.pk)
+            self.assertEqual(annotated.get_member_count(), 4)
+        self.assertEqual(family_group.get_member_count(), 4)
+    
+    def test_repeat_inference_is_served_from_cache(self):
+        """A second request for the same address reuses the family without rebuilding it"""
+        first = FamilyGroup.infer_family_from_address('Rose Villa', 'Male', self.user)
+        
+        with self.assertNumQueries(1):
+            second = FamilyGroup.infer_family_from_address('Rose Villa', 'Male', self.user)
+        
+        self.assertEqual(first.pk, second.pk)
+    
+    def test_mark_as_manually_updated_clears_cached_inference(self):
+        """Marking a family as manually updated drops its cached inference result"""
+        family_group = FamilyGroup.infer_family_from_address('Rose Villa', 'Male', self.user)
+        cache_key = FamilyGroup.inference_cache_key('Rose Villa', 'Male')
+        self.assertIsNotNone(cache.get(cache_key))
+        
+        family_group.mark_as_manually_updated()
+        
+        self.assertIsNone(cache.get(cache_key))
+    
+    def test_phonebook_edit_clears_cached_inference(self):
+        """A new resident at the address is picked up by the next inference instead of the cached family"""
+        FamilyGroup.infer_family_from_address('Rose Villa', 'Male', self.user)
+        PhoneBookEntry.objects.create(
+            pid=2006, name='Aminath Hassan', contact='7000006',
+            address='Rose Villa', island='Male', DOB='01/01/2012', gender='F'
+        )
+        
+        family_group = FamilyGroup.infer_family_from_address('Rose Villa', 'Male', self.user)
+        
+        self.assertIn(2006, set(family_group.members.values_list('entry_id', flat=True)))
+
+    def test_moving_resident_clears_both_cached_inferences(self):
+        """A move forgets the old and new address without an extra query to read the old one"""
+        old_key = FamilyGroup.inference_cache_key('Rose Villa', 'Male')
+        new_key = FamilyGroup.inference_cache_key('Lily Villa', 'Male')
+        cache.set(old_key, {'pk': 0, 'updated_at': None})
+        cache.set(new_key, {'pk': 0, 'updated_at': None})
+        entry = PhoneBookEntry.objects.get(pid=2003)
+        entry.address = 'Lily Villa'
+
+        with self.assertNumQueries(1):
+            entry.save()
+
+        self.assertIsNone(cache.get(old_key))
+        self.assertIsNone(cache.get(new_key))
+
+    def test_cache_outage_falls_back_to_rebuild(self):
+        """Cache errors neither stop inference nor undo marking a family as manually updated"""
+        broken_cache = mock.Mock(**{
+            'get.side_effect': ConnectionError, 'set.side_effect': ConnectionError, 'delete.side_effect': ConnectionError
+        })
+        with mock.patch('dirReactFinal_family.models.cache', broken_cache):
+            family_group = FamilyGroup.infer_family_from_address('Rose Villa', 'Male', self.user)
+            self.assertIsNotNone(family_group)
+            self.assertEqual(family_group.members.count(), 4)
+            
+            family_group.mark_as_manually_updated()
+        
+        family_group.refresh_from_db()
+        self.assertTrue(family_group.is_manually_updated)
+    
+    def test_manually_updated_family_is_preserved(self):
+        """Manually updated families are returned untouched"""
+        family_group = FamilyGroup.objects.create(
+            name='Custom', address='Rose Villa', island='Male',
+            created_by=self.user, is_manually_updated=True
+        )
+        FamilyMember.objects.create(entry=self.no_dob, family_group=family_group, role_in_family='parent')
+        
+        result = FamilyGroup.infer_family_from_address('Rose Villa', 'Male', self.user)
+        
+        self.assertEqual(result.pk, family_group.pk)
+        self.assertEqual(list(result.members.values_list('entry_id', flat=True)), [2005])
+    
+    def test_returns_none_without_dob(self):
+        """No family is created when nobody at the address has a usable DOB"""
+        result = FamilyGroup.infer_family_from_address('Nowhere', 'Male', self.user)
+        
+        self.assertIsNone(result)
+        self.assertFalse(FamilyGroup.objects.filter(address='Nowhere').exists())
+    
+    def test_bulk_inference_matches_single_address(self):
+        """Bulk inference consumes pairs in batches, builds each family once and reports misses as None"""
+        pairs = iter([('Rose Villa', 'Male'), ('Nowhere', 'Male'), ('Rose Villa', 'Male')])
+        results = FamilyGroup.infer_families_bulk(pairs, self.user, batch_size=1)
+        
+        self.assertEqual(len(results), 2)
+        
+        family_group = results[('Rose Villa', 'Male')]
+        self.assertIsNone(results[('Nowhere', 'Male')])
+        roles = dict(family_group.members.values_list('entry_id', 'role_in_family'))
+        self.assertEqual(roles, {2001: 'parent', 2002: 'parent', 2003: 'child', 2004: 'child'})
+        self.assertIn((2003, 2004, 'sibling'), set(family_group.relationships.values_list('person1_id', 'person2_id', 'relationship_type')))
+    
+    def test_rebuild_reuses_group_created_concurrently(self):
+        """A group inserted after the locked lookup found nothing is reused instead of raising"""
+        existing = FamilyGroup.objects.create(
+            name='Racer', address='Rose Villa', island='Male', created_by=self.user
+        )
+        entries_with_age = FamilyGroup._with_ages('Rose Villa', 'Male', [(2001, 'Ali Ahmed', 'M', '01/01/1960')])
+
+        family_group = FamilyGroup._infer_from_entries(None, 'Rose Villa', 'Male', entries_with_age, self.user)
+
+        self.assertEqual(family_group.pk, existing.pk)
+        self.assertEqual(list(family_group.members.values_list('entry_id', flat=True)), [2001])
+
+    def test_bulk_inference_preserves_manually_updated_families(self):
+        """Manually updated families in a batch are returned untouched while the others are rebuilt"""
+        manual = FamilyGroup.objects.create(
+            name='Custom', address='Rose Villa', island='Male',
+            created_by=self.user, is_manually_updated=True
+        )
+        PhoneBookEntry.objects.create(
+            pid=2006, name='Mariyam Adam', contact='7000006',
+            address='Lily Villa', island='Male', DOB='01/01/1990', gender='F'
+        )
+        
+        results = FamilyGroup.infer_families_bulk([('Rose Villa', 'Male'), ('Lily Villa', 'Male')], self.user)
+        
+        self.assertEqual(results[('Rose Villa', 'Male')].pk, manual.pk)
+        self.assertFalse(manual.members.exists())
+        self.assertEqual(list(results[('Lily Villa', 'Male')].members.values_list('entry_id', flat=True)), [2006])
+
+    def test_bulk_inference_skips_invalid_pairs(self):
+        """Bad pairs are reported as None while the rest of the batch, including JSON list pairs, is inferred"""
+        results = FamilyGroup.infer_families_bulk([
+            ('Rose Villa', None), [['Rose Villa'], 'Male'], ('Rose Villa', 'Male'), ['ROSE VILLA', 'Male']
+        ], self.user)
+
+        self.assertIsNone(results[('Rose Villa', None)])
+        self.assertIsNone(results[repr((['Rose Villa'], 'Male'))])
+        self.assertEqual(results[('Rose Villa', 'Male')].members.count(), 4)
+        self.assertEqual(results[('ROSE VILLA', 'Male')].members.count(), 4)
+
+    def test_bulk_inference_matches_like_single_inference(self):
+        """Pairs spelled differently only in case each receive every case-insensitive match"""
+        results = FamilyGroup.infer_families_bulk([('Rose Villa', 'Male'), ('ROSE VILLA', 'male')], self.user)
+
+        self.assertEqual(results[('Rose Villa', 'Male')].members.count(), 4)
+        self.assertEqual(results[('ROSE VILLA', 'male')].members.count(), 4)
+
+
+class CreateOrUpdateByAddressTestCase(APITestCase):
+    """
+    Test cases for creating or updating a family group with explicit members and relationships
+    """
+    
+    def setUp(self):
+        """Set up a user and three phonebook entries at one address"""
+        self.user = User.objects.create_user(
+            username='editor',
+            email='editor@test.com',
+            password='testpass123'
+        )
+        for pid, name in ((3001, 'Ahmed Ali'), (3002, 'Fathimath Ali'), (3003, 'Ibrahim Ali')):
+            PhoneBookEntry.objects.create(
+                pid=pid, name=name, contact=str(7100000 + pid),
+                address='Blue House', island='Male'
+            )
+        self.url = reverse('family:family-create-or-update-by-address')
+        self.client.force_authenticate(user=self.user)
+    
+    def test_creates_relationships_and_skips_duplicate_pairs(self):
+        """New relationships are stored once per pair and unknown pids are ignored"""
+        data = {
+            'address': 'Blue House',
+            'island': 'Male',
+            'members': [{'entry_id': 3001, 'role': 'parent'}, {'entry_id': 3003, 'role': 'child'}],
+            'relationships': [
+                {'person1_id': 3001, 'person2_id': 3003, 'relationship_type': 'parent'},
+                {'person1_id': 3003, 'person2_id': 3001, 'relationship_type': 'child'},
+                {'person1_id': 3002, 'person2_id': 9999, 'relationship_type': 'spouse'},
+            ]
+        }
+        response = self.client.post(self.url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        family_group = FamilyGroup.objects.get(address='Blue House', island='Male')
+        self.assertEqual(
+            list(family_group.relationships.values_list('person1_id', 'person2_id', 'relationship_type')),
+            [(3001, 3003, 'parent')]
+        )
+    
+    def test_members_skip_unknown_pids(self):
+        """Members are added with their roles and pids missing from the phonebook are ignored"""
+        data = {
+            'address': 'Blue House',
+            'island': 'Male',
+            'members': [
+                {'entry_id': 3001, 'role': 'parent'},
+                {'entry_id': '3002', 'role': 'parent'},
+                {'entry_id': 9999, 'role': 'child'},
+            ]
+        }
+        response = self.client.post(self.url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        family_group = FamilyGroup.objects.get(address='Blue House', island='Male')
+        self.assertEqual(
+            set(family_group.members.values_list('entry_id', 'role_in_family')),
+            {(3001, 'parent'), (3002, 'parent')}
+        )
+
+    def test_non_numeric_pids_are_rejected(self):
+        """Malformed pids return 400 and leave the address without a family group"""
+        response = self.client.post(self.url, {
+            'address': 'Blue House', 'island': 'Male',
+            'members': [{'entry_id': 3001, 'role': 'parent'}],
+            'relationships': [{'person1_id': 3001, 'person2_id': 'abc', 'relationship_type': 'parent'}]
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('abc', response.data['error'])
+        self.assertFalse(FamilyGroup.objects.filter(address='Blue House', island='Male').exists())
+
+    def test_explicit_update_clears_cached_inference(self):
+        """Explicit members and relationships replace whatever inference cached for the address"""
+        cache_key = FamilyGroup.inference_cache_key('Blue House', 'Male')
+        cache.set(cache_key, {'pk': 0, 'updated_at': None})
+        
+        response = self.client.post(self.url, {
+            'address': 'Blue House', 'island': 'Male',
+            'members': [{'entry_id': 3001, 'role': 'parent'}]
+        }, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(cache.get(cache_key))
+    
+    def test_update_keeps_existing_relationships(self):
+        """Updating an existing family adds new pairs without touching the old ones"""
+        self.client.post(self.url, {
+            'address': 'Blue House', 'island': 'Male',
+            'relationships': [{'person1_id': 3001, 'person2_id': 3003, 'relationship_type': 'parent'}]
+        }, format='json')
+        
+        response = self.client.post(self.url, {
+            'address': 'Blue House', 'island': 'Male',
+            'relationships': [
+                {'person1_id': 3003, 'person2_id': 3001, 'relationship_type': 'child'},
+                {'person1_id': 3001, 'person2_id': 3002, 'relationship_type': 'spouse'},
+            ]
+        }, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        family_group = FamilyGroup.objects.get(address='Blue House', island='Male')
+        self.assertEqual(
+            set(family_group.relationships.values_list('person1_id', 'person2_id', 'relationship_type')),
+            {(3001, 3003, 'parent'), (3001, 3002, 'spouse')}
+        )
+
+
+class FamilyAdminInferenceCacheTestCase(TestCase):
+    """
+    Test cases for admin edits of members and relationships clearing cached inference
+    """
+    
+    def setUp(self):
+        """Set up an admin, a family group with one member and a cached inference for it"""
+        cache.clear()
+        self.admin = User.objects.create_superuser(
+            username='familyadmin',
+            email='familyadmin@test.com',
+            password='testpass123'
+        )
+        self.client.force_login(self.admin)
+        self.entry = PhoneBookEntry.objects.create(
+            pid=4001, name='Ali Admin', contact='7400001',
+            address='Green Villa', island='Male', DOB='01/01/1970', gender='M'
+        )
+        self.family_group = FamilyGroup.objects.create(
+            name='Family at Green Villa', address='Green Villa', island='Male', created_by=self.admin
+        )
+        self.member = FamilyMember.objects.create(
+            entry=self.entry, family_group=self.family_group, role_in_family='member'
+        )
+        self.cache_key = FamilyGroup.inference_cache_key('Green Villa', 'Male')
+        cache.set(self.cache_key, {'pk': self.family_group.pk, 'updated_at': self.family_group.updated_at})
+    
+    def test_admin_change_clears_cached_inference(self):
+        """Saving a member through the admin change form forgets the cached family"""
+        url = reverse('admin:dirReactFinal_family_familymember_change', args=[self.member.pk])
+        response = self.client.post(url, {
+            'entry': self.entry.pk, 'family_group': self.family_group.pk, 'role_in_family': 'parent'
+        })
+        
+        self.assertEqual(response.status_code, 302)
+        self.assertIsNone(cache.get(self.cache_key))
+    
+    def test_admin_delete_clears_cached_inference(self):
+        """Deleting a member through the admin forgets the cached family"""
+        url = reverse('admin:dirReactFinal_family_familymember_delete', args=[self.member.pk])
+        response = self.client.post(url, {'post': 'yes'})
+        
+        self.assertEqual(response.status_code, 302)
+        self.assertIsNone(cache.get(self.cache_key))
@@ -5,11 +5,11 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Count
+from django.db.models import Q, Prefetch
 from django.contrib.auth import get_user_model
 from django.db import transaction
 
-from .models import FamilyGroup, FamilyMember, FamilyRelationship
+from .models import FamilyGroup, FamilyMember, FamilyRelationship, MEMBER_BATCH_SIZE, RELATIONSHIP_BATCH_SIZE
 from .serializers import (
     FamilyGroupSerializer, 
     FamilyMemberSerializer, 
@@ -18,9 +18,22 @@ from .serializers import (
     FamilyMemberDetailSerializer
 )
 from dirReactFinal_directory.models import PhoneBookEntry
+import logging
+
+logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
+
+def _is_pid(value):
+    """Check that a pid from a request payload can be used as a phonebook key"""
+    try:
+        int(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
 class FamilyGroupViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing family groups
@@ -55,7 +68,14 @@ class FamilyGroupViewSet(viewsets.ModelViewSet):
                 queryset = queryset.filter(is_public=False)
         
         # Add member count annotation
-        queryset = queryset.annotate(member_count=Count('members'))
+        queryset = queryset.with_member_counts()
+        
+        # Detail serializer renders members and relationships - load them with their entries in bulk
+        if self.action in ['retrieve', 'list']:
+            queryset = queryset.prefetch_related(
+                Prefetch('members', queryset=FamilyMember.objects.select_related('entry')),
+                Prefetch('relationships', queryset=FamilyRelationship.objects.select_related('person1', 'person2'))
+            )
         
         return queryset.order_by('-created_at')
     
@@ -86,7 +106,7 @@ class FamilyGroupViewSet(viewsets.ModelViewSet):
     def members(self, request, pk=None):
         """Get all members of a family group"""
         family_group = self.get_object()
-        members = FamilyMember.objects.filter(family_group=family_group)
+        members = FamilyMember.objects.filter(family_group=family_group).select_related('entry', 'family_group')
         serializer = FamilyMemberDetailSerializer(members, many=True)
         return Response(serializer.data)
     
@@ -155,18 +175,32 @@ class FamilyGroupViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # Reject malformed pids before anything is written instead of failing halfway with a 500
+        invalid_pids = [
+            pid for pid in (
+                [member_data.get('entry_id') for member_data in members] +
+                [rel_data.get(key) for rel_data in relationships for key in ('person1_id', 'person2_id')]
+            )
+            if pid and not _is_pid(pid)
+        ]
+        if invalid_pids:
+            return Response(
+                {'error': f'Invalid pids: {", ".join(str(pid) for pid in invalid_pids)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
         try:
             # 2025-01-28: ENHANCED - Use automatic family inference if no explicit data provided
             if not members and not relationships:
-                print(f"DEBUG: No explicit members/relationships provided - using automatic family inference")
+                logger.debug("No explicit members/relationships provided - using automatic family inference")
                 family_group = FamilyGroup.infer_family_from_address(address, island, request.user)
                 
                 if family_group:
-                    print(f"DEBUG: Successfully auto-inferred family group {family_group.id}")
+                    logger.debug("Successfully auto-inferred family group %s", family_group.id)
                     serializer = self.get_serializer(family_group)
                     return Response(serializer.data, status=status.HTTP_201_CREATED)
                 else:
-                    print(f"DEBUG: No family could be inferred - creating empty family group")
+                    logger.debug("No family could be inferred - creating empty family group")
                     # Create empty family group if inference fails
                     family_group = FamilyGroup.objects.create(
                         name=f"Family at {address}",
@@ -178,107 +212,133 @@ class FamilyGroupViewSet(viewsets.ModelViewSet):
                     serializer = self.get_serializer(family_group)
                     return Response(serializer.data, status=status.HTTP_201_CREATED)
             
-            # Try to get existing family group
-            family_group = FamilyGroup.get_by_address(address, island)
-            
-            if family_group:
-                # Update existing family group
-                if family_group.created_by != request.user and not request.user.is_staff:
-                    return Response(
-                        {'error': 'Only the creator or admins can update this family group'}, 
-                        status=status.HTTP_403_FORBIDDEN
-                    )
-                
-                # 2025-01-28: FIXED: Preserve existing relationships while updating members
-                # 2025-01-28: This prevents loss of original family structure when adding new relationships
-                print(f"DEBUG: Updating existing family group {family_group.id} - preserving relationships")
-                
-                # Update members (replace completely as requested)
-                family_group.members.all().delete()
-                
-                # 2025-01-28: CRITICAL: Do NOT delete existing relationships - merge with new ones
-                # 2025-01-28: This preserves the original family structure while allowing additions
-                existing_relationships = list(family_group.relationships.all())
-                print(f"DEBUG: Preserving {len(existing_relationships)} existing relationships")
+            # Member replacement and relationship inserts commit together or not at all
+            with transaction.atomic():
+                # Try to get existing family group - locked so concurrent updates of the same
+                # address apply one after the other
+                family_group = FamilyGroup.objects.select_for_update().filter(address=address, island=island).first()
                 
-                # 2025-01-28: Create a set of existing relationship pairs to avoid duplicates
-                existing_pairs = set()
-                for rel in existing_relationships:
-                    pair = tuple(sorted([rel.person1.pid, rel.person2.pid]))
-                    existing_pairs.add(pair)
+                if family_group:
+                    # Update existing family group
+                    if family_group.created_by != request.user and not request.user.is_staff:
+                        return Response(
+                            {'error': 'Only the creator or admins can update this family group'}, 
+                            status=status.HTTP_403_FORBIDDEN
+                        )
+                    
+                    # 2025-01-28: FIXED: Preserve existing relationships while updating members
+                    # 2025-01-28: This prevents loss of original family structure when adding new relationships
+                    logger.debug("Updating existing family group %s - preserving relationships", family_group.id)
+                    
+                    # Update members (replace completely as requested)
+                    family_group.members.all().delete()
+                    
+                    # 2025-01-28: CRITICAL: Do NOT delete existing relationships - merge with new ones
+                    # 2025-01-28: This preserves the original family structure while allowing additions
+                    # 2025-01-28: Create a set of existing relationship pairs to avoid duplicates
+                    # (seeded from the pid columns in one query, without loading the related entries)
+                    existing_pairs = {
+                        tuple(sorted(pair))
+                        for pair in family_group.relationships.values_list('person1_id', 'person2_id')
+                    }
+                    
+                    logger.debug("Preserving existing relationship pairs: %s", existing_pairs)
+                else:
+                    # Create new family group
+                    family_group = FamilyGroup.objects.create(
+                        name=f"Family at {address}",
+                        description=f"Family from {address}, {island}",
+                        address=address,
+                        island=island,
+                        created_by=request.user
+                    )
+                    existing_pairs = set()
+                    logger.debug("Created new family group %s", family_group.id)
                 
-                print(f"DEBUG: Existing relationship pairs: {existing_pairs}")
-            else:
-                # Create new family group
-                family_group = FamilyGroup.objects.create(
-                    name=f"Family at {address}",
-                    description=f"Family from {address}, {island}",
-                    address=address,
-                    island=island,
-                    created_by=request.user
+                # Add members - unknown pids are skipped, the rest are inserted together
+                # 2025-01-28: Fixed to use pid field instead of id for PhoneBookEntry
+                member_entries = PhoneBookEntry.objects.only('pid').in_bulk(
+                    {member_data.get('entry_id') for member_data in members if member_data.get('entry_id')}
                 )
-                existing_relationships = []
-                existing_pairs = set()
-                print(f"DEBUG: Created new family group {family_group.id}")
-            
-            # Add members
-            for member_data in members:
-                entry_id = member_data.get('entry_id')
-                role = member_data.get('role', 'member')
-                
-                if entry_id:
-                    try:
-                        # 2025-01-28: Fixed to use pid field instead of id for PhoneBookEntry
-                        entry = PhoneBookEntry.objects.get(pid=entry_id)
-                        FamilyMember.objects.create(
+                new_members = []
+                for member_data in members:
+                    entry_id = member_data.get('entry_id')
+                    role = member_data.get('role', 'member')
+                    
+                    if entry_id:
+                        entry = member_entries.get(int(entry_id))
+                        if entry is None:
+                            continue
+                        new_members.append(FamilyMember(
                             entry=entry,
                             family_group=family_group,
                             role_in_family=role
-                        )
-                    except PhoneBookEntry.DoesNotExist:
-                        continue
-            
-            # 2025-01-28: ENHANCED: Add relationships with duplicate prevention
-            relationships_added = 0
-            relationships_skipped = 0
-            
-            for rel_data in relationships:
-                person1_id = rel_data.get('person1_id')
-                person2_id = rel_data.get('person2_id')
-                rel_type = rel_data.get('relationship_type')
-                notes = rel_data.get('notes', '')
+                        ))
                 
-                if person1_id and person2_id and rel_type:
-                    try:
-                        # 2025-01-28: Fixed to use pid field instead of id for PhoneBookEntry
-                        person1 = PhoneBookEntry.objects.get(pid=person1_id)
-                        person2 = PhoneBookEntry.objects.get(pid=person2_id)
+                # Existing members were cleared above; the unique constraint drops repeated pids
+                FamilyMember.objects.bulk_create(new_members, batch_size=MEMBER_BATCH_SIZE, ignore_conflicts=True)
+                
+                # 2025-01-28: ENHANCED: Add relationships with duplicate prevention
+                # Queued rather than added: the bulk insert below may still drop conflicting rows
+                relationships_queued = 0
+                relationships_skipped = 0
+                
+                # Load every referenced entry in one query and collect new relationships for a single bulk insert
+                # 2025-01-28: Fixed to use pid field instead of id for PhoneBookEntry
+                # Only the key is needed to link the relationship, so skip the wide entry columns
+                entries_by_pid = PhoneBookEntry.objects.only('pid').in_bulk(
+                    {rel_data.get('person1_id') for rel_data in relationships} |
+                    {rel_data.get('person2_id') for rel_data in relationships}
+                )
+                new_relationships = []
+                
+                for rel_data in relationships:
+                    person1_id = rel_data.get('person1_id')
+                    person2_id = rel_data.get('person2_id')
+                    rel_type = rel_data.get('relationship_type')
+                    notes = rel_data.get('notes', '')
+                    
+                    if person1_id and person2_id and rel_type:
+                        # in_bulk keys are integers even when the payload sends pids as strings
+                        person1_id, person2_id = int(person1_id), int(person2_id)
+                        person1 = entries_by_pid.get(person1_id)
+                        person2 = entries_by_pid.get(person2_id)
+                        if person1 is None or person2 is None:
+                            continue
                         
                         # 2025-01-28: Check if this relationship already exists to prevent duplicates
                         pair = tuple(sorted([person1_id, person2_id]))
                         if pair in existing_pairs:
-                            print(f"DEBUG: Skipping duplicate relationship: {person1.name} -> {person2.name} ({rel_type})")
+                            logger.debug("Skipping duplicate relationship: %s -> %s (%s)", person1_id, person2_id, rel_type)
                             relationships_skipped += 1
                             continue
                         
                         # 2025-01-28: Create new relationship
-                        FamilyRelationship.objects.create(
+                        new_relationships.append(FamilyRelationship(
                             person1=person1,
                             person2=person2,
                             relationship_type=rel_type,
                             notes=notes,
                             family_group=family_group
-                        )
+                        ))
                         
                         # 2025-01-28: Add to existing pairs to prevent future duplicates
                         existing_pairs.add(pair)
-                        relationships_added += 1
+                        relationships_queued += 1
                         
-                        print(f"DEBUG: Created relationship: {person1.name} -> {person2.name} ({rel_type})")
-                    except PhoneBookEntry.DoesNotExist:
-                        continue
+                        logger.debug("Queued relationship: %s -> %s (%s)", person1_id, person2_id, rel_type)
+                
+                # The per-family unique constraint drops anything the pair check above missed
+                FamilyRelationship.objects.bulk_create(
+                    new_relationships,
+                    batch_size=RELATIONSHIP_BATCH_SIZE,
+                    ignore_conflicts=True
+                )
             
-            print(f"DEBUG: Relationship update summary: {relationships_added} added, {relationships_skipped} skipped")
+            # Explicit edits don't touch the group row, so drop any cached inference for the address
+            FamilyGroup.forget_inference(address, island)
+            
+            logger.debug("Relationship update summary: %s queued, %s skipped", relationships_queued, relationships_skipped)
             
             # 2025-01-28: Return the updated family group with all relationships
             serializer = self.get_serializer(family_group)
@@ -308,11 +368,11 @@ class FamilyGroupViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            print(f"DEBUG: Family inference requested for {address}, {island}")
+            logger.debug("Family inference requested for %s, %s", address, island)
             family_group = FamilyGroup.infer_family_from_address(address, island, request.user)
             
             if family_group:
-                print(f"DEBUG: Successfully inferred family group {family_group.id}")
+                logger.debug("Successfully inferred family group %s", family_group.id)
                 serializer = self.get_serializer(family_group)
                 return Response({
                     'success': True,
@@ -320,7 +380,7 @@ class FamilyGroupViewSet(viewsets.ModelViewSet):
                     'data': serializer.data
                 }, status=status.HTTP_201_CREATED)
             else:
-                print(f"DEBUG: No family could be inferred for {address}, {island}")
+                logger.debug("No family could be inferred for %s, %s", address, island)
                 return Response({
                     'success': False,
                     'message': f'No family members found with DOB for {address}, {island}',
@@ -328,7 +388,7 @@ class FamilyGroupViewSet(viewsets.ModelViewSet):
                 }, status=status.HTTP_404_NOT_FOUND)
                 
         except Exception as e:
-            print(f"ERROR: Family inference failed for {address}, {island}: {str(e)}")
+            logger.exception("Family inference failed for %s, %s", address, island)
             return Response({
                 'success': False,
                 'error': f'Failed to infer family: {str(e)}'
@@ -340,7 +400,7 @@ class FamilyGroupViewSet(viewsets.ModelViewSet):
         Delete updated families while preserving users and names from addresses.
         This function removes family associations but keeps all phonebook entries intact.
         """
-        print("=== DEBUG: delete_updated_families method called ===")
+        logger.debug("delete_updated_families called")
         # 2025-01-28: Added function to delete updated families while preserving users and names
         
         # Check if user is admin or staff
@@ -355,9 +415,10 @@ class FamilyGroupViewSet(viewsets.ModelViewSet):
         island = request.data.get('island')
         family_group_id = request.data.get('family_group_id')
         
-        print(f"DEBUG: delete_updated_families called with address={address}, island={island}, family_group_id={family_group_id}")
-        print(f"DEBUG: Request data: {request.data}")
-        print(f"DEBUG: Request user: {request.user.username} (staff: {request.user.is_staff})")
+        logger.debug(
+            "delete_updated_families called with address=%s, island=%s, family_group_id=%s by %s (staff: %s)",
+            address, island, family_group_id, request.user.username, request.user.is_staff
+        )
         
         # Validate parameters
         if not family_group_id and (not address or not island):
@@ -382,25 +443,17 @@ class FamilyGroupViewSet(viewsets.ModelViewSet):
                 )
         
         try:
-            print("DEBUG: About to start database transaction")
-            
             with transaction.atomic():
-                print("DEBUG: Transaction started successfully")
-                
                 if family_group_id:
                     # Delete specific family group
                     try:
                         family_group = FamilyGroup.objects.get(id=family_group_id)
-                        print(f"DEBUG: Found family group: {family_group.name}")
-                        
-                        # Delete family members and relationships
-                        FamilyMember.objects.filter(family_group=family_group).delete()
-                        FamilyRelationship.objects.filter(family_group=family_group).delete()
+                        logger.debug("Found family group: %s", family_group.name)
                         
-                        # Delete the family group itself
+                        # Deleting the group cascades to its members and relationships
                         family_group.delete()
                         
-                        print(f"DEBUG: Successfully deleted family group {family_group_id}")
+                        logger.debug("Successfully deleted family group %s", family_group_id)
                         
                         return Response({
                             'success': True,
@@ -415,30 +468,21 @@ class FamilyGroupViewSet(viewsets.ModelViewSet):
                         
                 else:
                     # Delete families by address and island
-                    families_to_delete = FamilyGroup.objects.filter(
+                    # One queryset delete removes every matching group; members and relationships
+                    # go with them through the cascade, each table in a single statement
+                    _, deleted_by_model = FamilyGroup.objects.filter(
                         address__iexact=address,
                         island__iexact=island
-                    )
+                    ).delete()
+                    deleted_count = deleted_by_model.get(FamilyGroup._meta.label, 0)
                     
-                    if not families_to_delete.exists():
+                    if not deleted_count:
                         return Response({
                             'success': False,
                             'error': f'No family groups found for {address}, {island}'
                         }, status=status.HTTP_404_NOT_FOUND)
                     
-                    deleted_count = 0
-                    for family_group in families_to_delete:
-                        print(f"DEBUG: Deleting family group: {family_group.name}")
-                        
-                        # Delete family members and relationships
-                        FamilyMember.objects.filter(family_group=family_group).delete()
-                        FamilyRelationship.objects.filter(family_group=family_group).delete()
-                        
-                        # Delete the family group itself
-                        family_group.delete()
-                        deleted_count += 1
-                    
-                    print(f"DEBUG: Successfully deleted {deleted_count} family groups")
+                    logger.debug("Successfully deleted %s family groups", deleted_count)
                     
                     return Response({
                         'success': True,
@@ -446,7 +490,7 @@ class FamilyGroupViewSet(viewsets.ModelViewSet):
                     }, status=status.HTTP_200_OK)
                     
         except Exception as e:
-            print(f"ERROR: Failed to delete updated families: {str(e)}")
+            logger.exception("Failed to delete updated families")
             return Response({
                 'success': False,
                 'error': f'Failed to delete updated families: {str(e)}'
@@ -472,7 +516,7 @@ class FamilyGroupViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
-            print(f"ERROR: Failed to mark family as manually updated: {str(e)}")
+            logger.exception("Failed to mark family as manually updated")
             return Response({
                 'success': False,
                 'error': f'Failed to mark family as manually updated: {str(e)}'
@@ -488,7 +532,8 @@ class FamilyMemberViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filter by family group and other parameters"""
-        queryset = FamilyMember.objects.all()
+        # The serializers read entry and family_group names for every member
+        queryset = FamilyMember.objects.select_related('entry', 'family_group')
         
         family_id = self.kwargs.get('family_pk')
         if family_id:
@@ -522,6 +567,7 @@ class FamilyMemberViewSet(viewsets.ModelViewSet):
             raise permissions.PermissionDenied("Only the creator or admins can add members")
         
         serializer.save(family_group=family_group)
+        FamilyGroup.forget_inference(family_group.address, family_group.island)
     
     def perform_update(self, serializer):
         """Ensure only creator or admins can update"""
@@ -531,7 +577,11 @@ class FamilyMemberViewSet(viewsets.ModelViewSet):
         if family_group.created_by != self.request.user and not self.request.user.is_staff:
             raise permissions.PermissionDenied("Only the creator or admins can update members")
         
-        serializer.save()
+        instance = serializer.save()
+        # The update may move the row to another family, so both addresses are refreshed
+        FamilyGroup.forget_inference(family_group.address, family_group.island)
+        if instance.family_group_id != family_group.id:
+            FamilyGroup.forget_inference(instance.family_group.address, instance.family_group.island)
     
     def perform_destroy(self, instance):
         """Ensure only creator or admins can remove"""
@@ -541,6 +591,7 @@ class FamilyMemberViewSet(viewsets.ModelViewSet):
             raise permissions.PermissionDenied("Only the creator or admins can remove members")
         
         instance.delete()
+        FamilyGroup.forget_inference(family_group.address, family_group.island)
 
 class FamilyRelationshipViewSet(viewsets.ModelViewSet):
     """
@@ -552,7 +603,8 @@ class FamilyRelationshipViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filter by family group"""
-        queryset = FamilyRelationship.objects.all()
+        # The serializer reads both entries' names and the permission checks read the family group
+        queryset = FamilyRelationship.objects.select_related('person1', 'person2', 'family_group')
         
         family_id = self.kwargs.get('family_pk')
         if family_id:
@@ -570,6 +622,7 @@ class FamilyRelationshipViewSet(viewsets.ModelViewSet):
             raise permissions.PermissionDenied("Only the creator or admins can add relationships")
         
         serializer.save(family_group=family_group)
+        FamilyGroup.forget_inference(family_group.address, family_group.island)
     
     def perform_update(self, serializer):
         """Ensure only creator or admins can update"""
@@ -579,7 +632,11 @@ class FamilyRelationshipViewSet(viewsets.ModelViewSet):
         if family_group.created_by != self.request.user and not self.request.user.is_staff:
             raise permissions.PermissionDenied("Only the creator or admins can update relationships")
         
-        serializer.save()
+        instance = serializer.save()
+        # The update may move the row to another family, so both addresses are refreshed
+        FamilyGroup.forget_inference(family_group.address, family_group.island)
+        if instance.family_group_id != family_group.id:
+            FamilyGroup.forget_inference(instance.family_group.address, instance.family_group.island)
     
     def perform_destroy(self, instance):
         """Ensure only creator or admins can delete"""
@@ -589,5 +646,4 @@ class FamilyRelationshipViewSet(viewsets.ModelViewSet):
             raise permissions.PermissionDenied("Only the creator or admins can delete relationships")
         
         instance.delete()
-
-print("=== DEBUG: views.py file loaded successfully ===")
+        FamilyGroup.forget_inference(family_group.address, family_group.island)